@@ -3,23 +3,48 @@
 
 # 导入必要的模块
 import os
+
+# 导入配置
+from config import current_config
+
+# 检查是否禁用SocketIO（用于Vercel等无服务器环境）
+disable_socketio = os.environ.get('DISABLE_SOCKETIO', 'false').lower() == 'true'
+
+# 选择SocketIO异步模式。eventlet/gevent需要在导入其他模块之前对标准库打补丁，
+# 使paho-mqtt的socket和后台线程能够与事件循环协作
+async_mode = current_config.SOCKETIO_ASYNC_MODE
+if not disable_socketio:
+    try:
+        if async_mode == 'eventlet':
+            import eventlet
+            eventlet.monkey_patch()
+        elif async_mode == 'gevent':
+            from gevent import monkey
+            monkey.patch_all()
+    except ImportError:
+        async_mode = 'threading'
+
 import sys
-import json
 import logging
 import time
+import queue
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # 导入Flask相关模块
 from flask import Flask, render_template, jsonify, request, make_response
 from flask_socketio import SocketIO, emit
 
-# 设置默认编码为UTF-8
-sys.stdout.reconfigure(encoding='utf-8')
-sys.stderr.reconfigure(encoding='utf-8')
+# 导入orjson，用于高性能的JSON编解码
+import orjson
 
-# 导入配置
-from config import current_config
+# 设置默认编码为UTF-8
+# 已是UTF-8时跳过，避免重复重建输出流
+for _stream in (sys.stdout, sys.stderr):
+    if (_stream.encoding or '').lower() not in ('utf-8', 'utf8'):
+        _stream.reconfigure(encoding='utf-8')
 
 # 导入数据管理器
 from data_manager import DataManager
@@ -31,6 +56,19 @@ import paho.mqtt.client as mqtt
 app = Flask(__name__)
 app.config.from_object(current_config)
 
+# 常用配置项，在模块加载时缓存，避免在消息处理热路径上重复查找
+MAX_TANKS = current_config.MAX_TANKS
+TANK_IDS = tuple(range(1, MAX_TANKS + 1))
+TOPIC_TANK_DATA = current_config.MQTT_TOPICS['tank_data']
+TOPIC_ADJUSTMENTS = current_config.MQTT_TOPICS.get('adjustments', 'tanks/adjustments')
+
+# 原始MQTT消息仅用于调试，只在调试模式下转发给WebSocket客户端
+EMIT_RAW_MESSAGES = current_config.DEBUG
+
+# 当前进程是否负责连接MQTT服务器。单进程模式下始终负责；多进程部署（配置了消息队列）时
+# 只有显式设置WORKER_ID=0的进程负责，其余进程只读取该进程保存的数据文件
+IS_MQTT_WORKER = current_config.SOCKETIO_MESSAGE_QUEUE is None or current_config.WORKER_ID == '0'
+
 # 配置日志
 logging.basicConfig(
     level=getattr(logging, current_config.LOG_LEVEL),
@@ -64,22 +102,119 @@ class MockSocketIO:
         pass
     
     @staticmethod
-    def run(*args, **kwargs):
+    def run(flask_app, **kwargs):
         # 使用标准的Flask应用运行
-        app.run(*args, **kwargs)
+        flask_app.run(**kwargs)
 
-# 检查是否禁用SocketIO（用于Vercel等无服务器环境）
-disable_socketio = os.environ.get('DISABLE_SOCKETIO', 'false').lower() == 'true'
+class OrjsonSerializer:
+    """基于orjson的JSON序列化器，提供与标准库兼容的dumps/loads接口供SocketIO使用"""
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
 
 # 初始化SocketIO，用于实时通信
 socketio = None
 if not disable_socketio:
-    from flask_socketio import SocketIO, emit
-    socketio = SocketIO(app, cors_allowed_origins="*")
+    if async_mode != current_config.SOCKETIO_ASYNC_MODE:
+        logger.warning(f"未安装{current_config.SOCKETIO_ASYNC_MODE}，SocketIO回退到threading模式（仅适用于开发环境）")
+    socketio = SocketIO(
+        app,
+        cors_allowed_origins="*",
+        async_mode=async_mode,
+        json=OrjsonSerializer,
+        message_queue=current_config.SOCKETIO_MESSAGE_QUEUE
+    )
+    logger.info(f"SocketIO异步模式: {async_mode}")
 else:
     logger.info("SocketIO已禁用，运行在纯HTTP模式下")
     socketio = MockSocketIO()
 
+# SocketIO广播队列，MQTT回调只负责入队，由后台任务合并后统一发送
+_emit_queue = queue.Queue(maxsize=current_config.SOCKETIO_EMIT_QUEUE_SIZE)
+
+def queue_emit(event, data, key=None):
+    """将SocketIO事件放入广播队列
+    
+    同一合并窗口内键相同的事件只会发送最新的一条，从而避免高频MQTT消息
+    导致的重复序列化和广播。
+    
+    Args:
+        event: 事件名称
+        data: 事件数据，也可以是在发送时才生成数据的可调用对象（返回None时不发送）
+        key: 合并键，默认使用事件名称
+    """
+    if disable_socketio:
+        return
+    try:
+        _emit_queue.put_nowait((key or event, event, data))
+    except queue.Full:
+        logger.warning(f"SocketIO广播队列已满，丢弃事件: {event}")
+
+def emit_worker():
+    """后台广播任务，按时间窗口或事件数量批量合并并发送队列中的事件"""
+    interval = current_config.SOCKETIO_EMIT_INTERVAL_MS / 1000.0
+    max_batch = current_config.SOCKETIO_EMIT_BATCH_SIZE
+    while True:
+        key, event, data = _emit_queue.get()
+        pending = {key: (event, data)}
+        received = 1
+        deadline = time.monotonic() + interval
+        
+        # 在合并窗口内继续收集事件，相同键的事件以最新的为准
+        while received < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                key, event, data = _emit_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending[key] = (event, data)
+            received += 1
+        
+        # 每个事件单独捕获异常，某个事件失败不影响同批次其他事件的发送
+        for event, data in pending.values():
+            try:
+                if callable(data):
+                    data = data()
+                    if data is None:
+                        continue
+                socketio.emit(event, data)
+            except Exception as e:
+                logger.error(f"发送SocketIO广播时出错 ({event}): {str(e)}")
+
+# 罐数据锁，消息处理线程、HTTP请求和后台任务都会访问tank_data
+tank_data_lock = threading.Lock()
+
+# MQTT消息处理线程池。默认只使用一个工作线程以保证消息按接收顺序处理，
+# 多个工作线程时同一罐的先后两条消息可能乱序
+_message_executor = ThreadPoolExecutor(
+    max_workers=current_config.MQTT_MESSAGE_WORKERS,
+    thread_name_prefix='mqtt-message'
+)
+
+# 复用的误差调整发布数据，以及上次发布的序列化结果
+_adjustments_data = {'adjustments': [{'adjustmentFactor': 0.0} for _ in TANK_IDS]}
+_last_adjustments_payload = None
+
+# 每个罐最近一次发送报警事件的时间（time.monotonic）
+_last_alarm_times = {}
+
+# 序列化后的完整罐数据快照，罐数据变化时置为None
+_tank_snapshot = None
+
+# 自上次广播以来数据发生变化的罐ID
+_dirty_tanks = set()
+_dirty_lock = threading.Lock()
+
+# 待保存标记，由后台保存任务定期检查并写入文件
+_subscribed_save_pending = threading.Event()
+_error_save_pending = threading.Event()
+
 # 初始化全局变量
 mqtt_client_instance = None
 tank_data = {}
@@ -94,7 +229,7 @@ os.makedirs(data_dir, exist_ok=True)
 def initialize_tanks():
     """初始化罐数据结构"""
     tanks = {}
-    for i in range(1, current_config.MAX_TANKS + 1):
+    for i in TANK_IDS:
         # 为了测试，使用一些有意义的默认值，而不是全部为0
         tanks[i] = {
             'id': i,
@@ -130,8 +265,8 @@ def on_mqtt_connect(client, userdata, flags, rc):
         # 发送连接状态到前端
         socketio.emit('mqtt_status', {'connected': True, 'message': '已连接到MQTT服务器'})
         # 订阅主题
-        client.subscribe(current_config.MQTT_TOPICS['tank_data'], qos=0)
-        client.subscribe(current_config.MQTT_TOPICS['adjustments'], qos=0)
+        client.subscribe(TOPIC_TANK_DATA, qos=0)
+        client.subscribe(TOPIC_ADJUSTMENTS, qos=0)
     else:
         is_connected = False
         # 定义返回码含义字典
@@ -170,7 +305,8 @@ def on_mqtt_disconnect(client, userdata, rc):
 
 def on_mqtt_message(client, userdata, msg):
     """MQTT消息接收回调函数
-    当客户端接收到MQTT消息时被调用，处理不同主题的消息
+    当客户端接收到MQTT消息时被调用。消息的解析和处理交给消息处理线程池，
+    使paho的网络线程能够尽快继续读取socket数据
     
     Args:
         client: MQTT客户端实例
@@ -178,71 +314,74 @@ def on_mqtt_message(client, userdata, msg):
         msg: MQTT消息对象，包含topic和payload
     """
     try:
-        # 尝试解析JSON消息
-        payload = msg.payload.decode('utf-8')
-        data = json.loads(payload)
-        
-        # 添加更详细的接收数据日志
-        logger.info(f"[MQTT接收] 时间: {time.strftime('%Y-%m-%d %H:%M:%S')}, 主题: {msg.topic}, 负载: {json.dumps(data, ensure_ascii=False)}")
-        
-        # 处理罐数据
-        if msg.topic == current_config.MQTT_TOPICS['tank_data']:
-            # 支持两种格式：
-            # 1. {"tanks": [{...}, {...}]} - 带有tanks键的格式
-            # 2. [{...}, {...}] 或 {...} - 直接的列表或字典格式
-            if isinstance(data, dict) and 'tanks' in data:
-                # 提取tanks列表并处理
-                update_tank_data(data['tanks'])
-            else:
-                # 处理原始格式
-                update_tank_data(data)
-            logger.debug(f"处理罐数据 - 主题: {msg.topic}")
-        
-        # 处理误差调整数据
-        elif msg.topic == current_config.MQTT_TOPICS['adjustments']:
-            update_tank_adjustments(data)
-            logger.debug(f"处理误差调整数据 - 主题: {msg.topic}")
-        
-        # 发送消息到WebSocket客户端
-        socketio.emit('mqtt_message', {
-            'topic': msg.topic,
-            'payload': data
-        })
+        _message_executor.submit(process_mqtt_message, msg.topic, msg.payload)
+    except RuntimeError as e:
+        # 线程池已关闭（应用正在退出）
+        logger.warning(f"消息处理线程池不可用，丢弃消息: {str(e)}")
+
+def process_mqtt_message(topic, payload):
+    """在消息处理线程池中解析并处理MQTT消息
+    
+    Args:
+        topic: 消息主题
+        payload: 消息负载（bytes）
+    """
+    try:
+        # 尝试解析JSON消息（orjson直接接受bytes，无需先解码）
+        data = orjson.loads(payload)
+        
+        # 接收数据日志，仅在启用DEBUG级别时才重新序列化负载
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[MQTT接收] 主题: %s, 负载: %s", topic, orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8'))
+        
+        # 根据主题分发到对应的处理函数
+        handler = TOPIC_HANDLERS.get(topic)
+        if handler:
+            with tank_data_lock:
+                handler(data)
+        
+        # 调试模式下发送原始消息到WebSocket客户端（同一主题只保留最新的消息）
+        if EMIT_RAW_MESSAGES:
+            queue_emit('mqtt_message', {
+                'topic': topic,
+                'payload': data
+            }, key=('mqtt_message', topic))
         
         # 记录日志
-        logger.debug(f"收到消息 - 主题: {msg.topic}, 负载: {payload[:100]}...")
+        logger.debug("收到消息 - 主题: %s, 负载: %.100r...", topic, payload)
     except Exception as e:
         logger.error(f"处理MQTT消息时出错: {str(e)}")
 
 def update_tank_adjustments(data):
     """更新罐的误差调整值"""
-    global tank_data
+    global tank_data, _last_adjustments_payload
     try:
-        logger.debug(f"收到误差调整数据: {data}")
+        logger.debug("收到误差调整数据: %s", data)
         
         # 检查数据格式
         if isinstance(data, dict) and 'adjustments' in data:
             adjustments = data['adjustments']
-            logger.debug(f"处理{len(adjustments)}个误差调整值")
+            logger.debug("处理%d个误差调整值", len(adjustments))
             
-            # 处理每个调整值
-            for i, adjustment in enumerate(adjustments):
-                tank_id = i + 1  # 索引从0开始，罐ID从1开始
+            # 处理每个调整值，列表顺序对应罐1到罐MAX_TANKS，超出部分由zip截断
+            _float = float
+            for tank_id, adjustment in zip(TANK_IDS, adjustments):
+                adjustment_factor = _float(adjustment.get('adjustmentFactor', 0.0))
+                logger.debug("更新罐%s的误差值为: %s", tank_id, adjustment_factor)
                 
-                if 1 <= tank_id <= current_config.MAX_TANKS:
-                    adjustment_factor = float(adjustment.get('adjustmentFactor', 0))
-                    logger.debug(f"更新罐{tank_id}的误差值为: {adjustment_factor}")
-                    
-                    # 更新罐的误差值
-                    if tank_id in tank_data:
-                        tank_data[tank_id]['error'] = adjustment_factor
+                # 更新罐的误差值，只有值发生变化的罐才会包含在增量广播中
+                if tank_id in tank_data and set_tank_field(tank_data[tank_id], 'error', adjustment_factor):
+                    mark_tank_dirty(tank_id)
+            
+            # 调整值可能来自其他发布者，上次发布的内容已不能代表服务器上的最新状态
+            _last_adjustments_payload = None
             
             # 保存更新后的误差数据
             save_error_data()
             
-            # 通知前端数据已更新
-            socketio.emit('tank_data_update', tank_data)
-            logger.info(f"已成功更新{min(len(adjustments), current_config.MAX_TANKS)}个罐的误差值")
+            # 通知前端发生变化的罐数据
+            queue_emit('tank_data_delta', pop_tank_delta)
+            logger.info(f"已成功更新{min(len(adjustments), MAX_TANKS)}个罐的误差值")
         else:
             logger.warning(f"收到的误差调整数据格式不正确: {data}")
     except Exception as e:
@@ -253,127 +392,294 @@ def update_tank_data(data):
     global tank_data
     
     try:
+        # 带有tanks键的格式先展开为罐数据列表，保证每条消息只广播和保存一次
+        if isinstance(data, dict) and 'tanks' in data:
+            data = data['tanks']
+        
+        # 日志级别在整批数据中只检查一次
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
         # 检查数据格式是否正确
         if isinstance(data, dict):
-            # 检查是否是带有tanks键的格式
-            if 'tanks' in data:
-                logger.debug(f"处理带有tanks键的字典格式数据")
-                update_tank_data(data['tanks'])
-            else:
-                # 处理单罐数据
-                logger.debug(f"处理单罐数据")
-                process_tank_data(data)
+            # 处理单罐数据
+            logger.debug("处理单罐数据")
+            check_alarms([process_tank_data(data, debug_enabled)])
         elif isinstance(data, list):
             # 处理多罐数据
-            logger.debug(f"处理多罐数据列表，包含{len(data)}个罐")
+            logger.debug("处理多罐数据列表，包含%d个罐", len(data))
             
             # 对于用户提供的格式（没有id字段的列表），使用索引作为id
             if data and isinstance(data[0], dict) and 'id' not in data[0]:
-                logger.debug(f"处理没有id字段的列表格式数据")
-                # 假设列表顺序对应罐1到罐11
-                for i, tank in enumerate(data):
-                    tank_id = i + 1  # 索引从0开始，罐ID从1开始
-                    if 1 <= tank_id <= current_config.MAX_TANKS:
-                        tank_with_id = tank.copy()
-                        tank_with_id['id'] = tank_id
-                        logger.debug(f"为罐{i+1}添加ID并处理数据: {tank_with_id}")
-                        process_tank_data(tank_with_id)
+                logger.debug("处理没有id字段的列表格式数据")
+                # 假设列表顺序对应罐1到罐11，超出MAX_TANKS的部分由zip截断
+                updated_ids = []
+                for tank_id, tank in zip(TANK_IDS, data):
+                    # 数据是刚解析出的JSON对象，直接写入id而无需复制
+                    tank['id'] = tank_id
+                    updated_ids.append(process_tank_data(tank, debug_enabled))
             else:
                 # 对于有id字段的列表，直接处理
-                logger.debug(f"处理有id字段的列表格式数据")
-                for tank in data:
-                    process_tank_data(tank)
+                logger.debug("处理有id字段的列表格式数据")
+                updated_ids = [process_tank_data(tank, debug_enabled) for tank in data]
+            
+            # 整批数据处理完成后统一检查报警
+            check_alarms(updated_ids)
         
-        # 发送更新后的罐数据到WebSocket客户端
-        socketio.emit('tank_data_update', tank_data)
+        # 只向WebSocket客户端发送发生变化的罐数据
+        queue_emit('tank_data_delta', pop_tank_delta)
         
         # 保存数据到文件
         save_subscribed_data()
     except Exception as e:
         logger.error(f"更新罐数据时出错: {str(e)}")
 
-def process_tank_data(data):
-    """处理单个罐的数据"""
+# MQTT主题处理函数分发表，在模块加载时根据配置预先构建
+# 罐数据支持两种格式：
+# 1. {"tanks": [{...}, {...}]} - 带有tanks键的格式
+# 2. [{...}, {...}] 或 {...} - 直接的列表或字典格式
+# 两个主题配置相同时以罐数据处理优先，因此罐数据主题最后写入
+TOPIC_HANDLERS = {
+    TOPIC_ADJUSTMENTS: update_tank_adjustments,
+    TOPIC_TANK_DATA: update_tank_data,
+}
+
+def process_tank_data(data, debug_enabled=None):
+    """处理单个罐的数据
+    
+    报警检查不在此处进行，由调用方在整批数据处理完成后通过check_alarms统一执行。
+    
+    Args:
+        data: 单个罐的数据
+        debug_enabled: 是否输出DEBUG日志，批量处理时由调用方传入，None表示自行检查
+    
+    Returns:
+        int: 已更新的罐ID，罐不存在或处理失败时返回None
+    """
     global tank_data
     
     try:
         tank_id = int(data.get('id', 0))
-        # 使用info级别并添加时间戳，记录详细的罐数据处理过程
-        logger.info(f"[罐数据处理] 时间: {time.strftime('%Y-%m-%d %H:%M:%S')}, ID: {tank_id}, 原始数据: {json.dumps(data, ensure_ascii=False)}")
-        if tank_id in tank_data:
-            # 更新罐数据
-            if 'temperature' in data:
-                tank_data[tank_id]['temperature'] = float(data['temperature'])
-            if 'level' in data:
-                # 不再应用误差调整，直接使用原始液位值
-                level = float(data['level'])
-                tank_data[tank_id]['level'] = level
-                logger.info(f"[罐数据处理] 罐{tank_id}: 更新液位值为 {level}")
-            if 'weight' in data:
-                tank_data[tank_id]['weight'] = float(data['weight'])
-            
-            # 添加对高限数据的处理，允许通过订阅信息修改高限
-            if 'high_limit' in data:
-                new_high_limit = float(data['high_limit'])
-                logger.info(f"[罐数据处理] 罐{tank_id}: 更新高限数据 (high_limit) 为 {new_high_limit}")
-                tank_data[tank_id]['high_limit'] = new_high_limit
-            elif 'levelHighLimit' in data:  # 兼容旧格式的高限字段
-                new_high_limit = float(data['levelHighLimit'])
-                logger.info(f"[罐数据处理] 罐{tank_id}: 更新高限数据 (levelHighLimit) 为 {new_high_limit}")
-                tank_data[tank_id]['high_limit'] = new_high_limit
-            
-            # 检查是否需要报警
-            check_alarm(tank_id)
-            logger.info(f"[罐数据处理] 罐{tank_id}: 处理完成，更新后数据: {json.dumps(tank_data[tank_id], ensure_ascii=False)}")
-        else:
+        # 记录详细的罐数据处理过程，仅在启用DEBUG级别时才序列化原始数据
+        if debug_enabled is None:
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("[罐数据处理] ID: %s, 原始数据: %s", tank_id, orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8'))
+        tank = tank_data.get(tank_id)
+        if tank is None:
             logger.warning(f"罐ID {tank_id} 不存在")
+            return None
+        
+        # 绑定为局部变量，减少重复的全局和属性查找
+        _float = float
+        _get = data.get
+        changed = False
+        
+        # 更新罐数据，只有值发生变化时才标记为已修改
+        temperature = _get('temperature')
+        if temperature is not None:
+            changed |= set_tank_field(tank, 'temperature', _float(temperature))
+        level = _get('level')
+        if level is not None:
+            # 不再应用误差调整，直接使用原始液位值
+            level = _float(level)
+            changed |= set_tank_field(tank, 'level', level)
+            logger.debug("[罐数据处理] 罐%s: 更新液位值为 %s", tank_id, level)
+        weight = _get('weight')
+        if weight is not None:
+            changed |= set_tank_field(tank, 'weight', _float(weight))
+        
+        # 添加对高限数据的处理，允许通过订阅信息修改高限，兼容旧格式的levelHighLimit字段
+        high_limit = _get('high_limit')
+        if high_limit is None:
+            high_limit = _get('levelHighLimit')
+        if high_limit is not None:
+            high_limit = _float(high_limit)
+            logger.debug("[罐数据处理] 罐%s: 更新高限数据为 %s", tank_id, high_limit)
+            changed |= set_tank_field(tank, 'high_limit', high_limit)
+        
+        if changed:
+            mark_tank_dirty(tank_id)
+        if debug_enabled:
+            logger.debug("[罐数据处理] 罐%s: 处理完成，更新后数据: %s", tank_id, orjson.dumps(tank).decode('utf-8'))
+        return tank_id
     except Exception as e:
         logger.error(f"处理单个罐数据时出错: {str(e)}")
+    return None
+
+def set_tank_field(tank, key, value):
+    """设置罐的字段值
+    
+    Returns:
+        bool: 字段值是否发生了变化
+    """
+    if tank.get(key) == value:
+        return False
+    tank[key] = value
+    return True
+
+def mark_tank_dirty(tank_id):
+    """标记罐数据已修改，等待下一次增量广播，同时使缓存的完整快照失效"""
+    global _tank_snapshot
+    with _dirty_lock:
+        _dirty_tanks.add(tank_id)
+    _tank_snapshot = None
+
+def get_tank_snapshot():
+    """获取序列化后的完整罐数据快照
+    
+    快照在罐数据变化后的第一次调用时重新生成，之后新连接的客户端直接复用。
+    
+    Returns:
+        bytes: JSON格式的罐数据
+    """
+    global _tank_snapshot
+    with tank_data_lock:
+        if _tank_snapshot is None:
+            _tank_snapshot = orjson.dumps(tank_data, option=orjson.OPT_NON_STR_KEYS)
+        return _tank_snapshot
+
+def pop_tank_delta():
+    """取出自上次广播以来发生变化的罐数据
+    
+    Returns:
+        dict: 以罐ID为键的增量数据，没有变化时返回None
+    """
+    global _dirty_tanks
+    with _dirty_lock:
+        dirty, _dirty_tanks = _dirty_tanks, set()
+    if not dirty:
+        return None
+    with tank_data_lock:
+        return {tank_id: dict(tank_data[tank_id]) for tank_id in dirty if tank_id in tank_data}
+
+def check_alarms(tank_ids):
+    """对一批已更新的罐统一检查报警，报警状态变化的罐会被标记为已修改
+    
+    Args:
+        tank_ids: 已更新的罐ID列表，None会被忽略
+    """
+    for tank_id in tank_ids:
+        if tank_id is not None and check_alarm(tank_id):
+            mark_tank_dirty(tank_id)
 
 def check_alarm(tank_id):
-    """检查是否需要报警"""
+    """检查是否需要报警
+    
+    液位需要低于高限一定比例（ALARM_HYSTERESIS）才会解除报警，避免液位在高限附近
+    波动时反复触发；同一个罐在ALARM_COOLDOWN秒内不会重复发送报警事件。
+    
+    Returns:
+        bool: 报警状态是否发生了变化
+    """
     if tank_id in tank_data:
         tank = tank_data[tank_id]
         if tank['level'] > tank['high_limit'] and not tank['alarm_shown']:
             tank['alarm_shown'] = True
-            socketio.emit('alarm', {
-                'tank_id': tank_id,
-                'tank_name': tank['name'],
-                'level': tank['level'],
-                'high_limit': tank['high_limit']
-            })
-        elif tank['level'] <= tank['high_limit'] and tank['alarm_shown']:
+            now = time.monotonic()
+            last_alarm_time = _last_alarm_times.get(tank_id)
+            if last_alarm_time is None or now - last_alarm_time >= current_config.ALARM_COOLDOWN:
+                _last_alarm_times[tank_id] = now
+                # 调用方持有tank_data_lock，报警事件交给广播队列发送，避免在锁内做网络I/O
+                queue_emit('alarm', {
+                    'tank_id': tank_id,
+                    'tank_name': tank['name'],
+                    'level': tank['level'],
+                    'high_limit': tank['high_limit']
+                }, key=('alarm', tank_id, now))
+            return True
+        elif tank['alarm_shown'] and tank['level'] < tank['high_limit'] * (1 - current_config.ALARM_HYSTERESIS):
             tank['alarm_shown'] = False
+            return True
+    return False
+
+def write_json_file(path, data):
+    """将数据原子地写入JSON文件
+    
+    先写入临时文件再替换目标文件，避免写入过程中断导致文件损坏。
+    使用紧凑格式输出，不再缩进，减少序列化时间和文件大小。
+    """
+    # 临时文件名带上进程号和线程号，多个进程或线程同时保存时不会互相覆盖临时文件
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb', buffering=64 * 1024) as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+    os.replace(tmp_path, path)
 
 def save_subscribed_data():
+    """标记订阅数据需要保存，由后台保存任务合并写入文件"""
+    _subscribed_save_pending.set()
+
+def write_subscribed_data():
     """保存订阅的数据到文件"""
     try:
-        with open(current_config.SUBSCRIBED_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(tank_data, f, ensure_ascii=False, indent=2)
+        with tank_data_lock:
+            write_json_file(current_config.SUBSCRIBED_DATA_FILE, tank_data)
     except Exception as e:
         logger.error(f"保存订阅数据时出错: {str(e)}")
 
+def flush_pending_saves():
+    """将所有待保存的数据写入文件"""
+    if _subscribed_save_pending.is_set():
+        _subscribed_save_pending.clear()
+        write_subscribed_data()
+    if _error_save_pending.is_set():
+        _error_save_pending.clear()
+        write_error_data()
+
+def save_worker():
+    """后台保存任务，每隔DATA_SAVE_INTERVAL秒将有变化的数据写入文件，避免每条消息都写盘"""
+    while True:
+        time.sleep(current_config.DATA_SAVE_INTERVAL)
+        flush_pending_saves()
+
 def load_subscribed_data():
     """从文件加载订阅的数据"""
     global tank_data
     try:
-        if os.path.exists(current_config.SUBSCRIBED_DATA_FILE):
-            with open(current_config.SUBSCRIBED_DATA_FILE, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-                # 合并加载的数据，但保留初始结构
-                for tank_id, tank_info in loaded_data.items():
-                    # 确保tank_id可以转换为整数
-                    try:
-                        tank_id_int = int(tank_id)
-                        if tank_id_int in tank_data:
-                            for key, value in tank_info.items():
-                                if key in tank_data[tank_id_int]:
-                                    tank_data[tank_id_int][key] = value
-                    except ValueError:
-                        logger.warning(f"跳过无效的罐ID: {tank_id}")
+        with open(current_config.SUBSCRIBED_DATA_FILE, 'rb') as f:
+            loaded_data = orjson.loads(f.read())
+        # 合并加载的数据，但保留初始结构
+        for tank_id, tank_info in loaded_data.items():
+            # 确保tank_id可以转换为整数
+            try:
+                tank_id_int = int(tank_id)
+                if tank_id_int in tank_data:
+                    for key, value in tank_info.items():
+                        if key in tank_data[tank_id_int]:
+                            tank_data[tank_id_int][key] = value
+            except ValueError:
+                logger.warning(f"跳过无效的罐ID: {tank_id}")
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.error(f"加载订阅数据时出错: {str(e)}")
 
+# 非MQTT进程上次加载的数据文件修改时间
+_loaded_file_mtimes = {}
+
+def refresh_tank_data():
+    """非MQTT进程从MQTT进程保存的数据文件中刷新罐数据
+    
+    多进程部署时只有MQTT进程接收实时数据，其余进程在提供初始数据前检查数据文件
+    是否有更新，避免一直返回进程启动时加载的数据。MQTT进程中直接返回。
+    """
+    if IS_MQTT_WORKER:
+        return
+    global _tank_snapshot
+    changed = False
+    for path in (current_config.SUBSCRIBED_DATA_FILE, current_config.ERROR_DATA_FILE):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        if _loaded_file_mtimes.get(path) != mtime:
+            _loaded_file_mtimes[path] = mtime
+            changed = True
+    if changed:
+        with tank_data_lock:
+            load_subscribed_data()
+            load_error_data()
+            _tank_snapshot = None
+
 # 初始化MQTT客户端
 def initialize_mqtt_client():
     """初始化MQTT客户端"""
@@ -387,12 +693,14 @@ def initialize_mqtt_client():
         # 检查并设置TLS，确保与测试脚本一致
         use_tls = os.environ.get('MQTT_USE_TLS', str(current_config.MQTT_TLS_ENABLED).lower()).lower() == 'true'
         
-        # 打印调试信息，确认当前使用的配置值
-        logger.debug(f"[配置调试] MQTT_HOST: {mqtt_host}")
-        logger.debug(f"[配置调试] MQTT_PORT: {mqtt_port}")
-        logger.debug(f"[配置调试] MQTT_USE_TLS: {use_tls}")
-        logger.debug(f"[配置调试] MQTT_USERNAME: {current_config.MQTT_USERNAME}")
-        logger.debug(f"[配置调试] MQTT_PASSWORD: {'******' if current_config.MQTT_PASSWORD else '空'}")
+        # 打印调试信息，确认当前使用的配置值（仅在启用DEBUG级别时格式化）
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("[配置调试] MQTT_HOST: %s", mqtt_host)
+            logger.debug("[配置调试] MQTT_PORT: %s", mqtt_port)
+            logger.debug("[配置调试] MQTT_USE_TLS: %s", use_tls)
+            logger.debug("[配置调试] MQTT_USERNAME: %s", current_config.MQTT_USERNAME)
+            logger.debug("[配置调试] MQTT_PASSWORD: %s", '******' if current_config.MQTT_PASSWORD else '空')
         
         # 从环境变量获取WebSocket相关配置，如果没有则使用默认值
         use_websockets = os.environ.get('MQTT_USE_WEBSOCKETS', 'False').lower() == 'true'
@@ -421,13 +729,18 @@ def initialize_mqtt_client():
         mqtt_client_instance.on_disconnect = on_mqtt_disconnect
         mqtt_client_instance.on_message = on_mqtt_message
         
+        # 扩大QoS>0消息的在途窗口，并且不限制发送队列长度，避免高消息速率下出现背压
+        mqtt_client_instance.max_inflight_messages_set(1000)
+        mqtt_client_instance.max_queued_messages_set(0)
+        
         # 配置自动重连策略 - 更保守的重连策略（兼容旧版本paho-mqtt）
         mqtt_client_instance.reconnect_delay_set(min_delay=2, max_delay=30)
         # 注意：enable_bridge_mode()可能在某些paho-mqtt版本中不可用，这里不使用它
         
         # 设置心跳包频率，确保与服务器保持活跃连接
         keepalive = int(os.environ.get('MQTT_KEEPALIVE', str(current_config.MQTT_KEEPALIVE)))
-        logger.debug(f"[配置调试] MQTT_KEEPALIVE: {keepalive}")
+        if debug_enabled:
+            logger.debug("[配置调试] MQTT_KEEPALIVE: %s", keepalive)
         
         # 设置用户名和密码 - 直接从环境变量获取，确保与run.py中的设置一致
         mqtt_username = os.environ.get('MQTT_USERNAME', current_config.MQTT_USERNAME)
@@ -485,12 +798,14 @@ def initialize_mqtt_client():
 @app.route('/')
 def index():
     """首页路由"""
+    refresh_tank_data()
     # 检查MQTT客户端实例是否存在并获取连接状态
     return render_template('index.html', tanks=tank_data, mqtt_connected=is_connected, os=os)
 
 @app.route('/api/tanks')
 def get_tanks():
     """获取所有罐数据的API"""
+    refresh_tank_data()
     return jsonify(tank_data)
 
 @app.route('/api/mqtt/status')
@@ -503,8 +818,8 @@ def get_mqtt_status():
         try:
             # 由于我们使用标准客户端，这里简化处理
             subscribed_topics = [
-                {'topic': current_config.MQTT_TOPICS['tank_data'], 'qos': 0},
-                {'topic': current_config.MQTT_TOPICS['adjustments'], 'qos': 0}
+                {'topic': TOPIC_TANK_DATA, 'qos': 0},
+                {'topic': TOPIC_ADJUSTMENTS, 'qos': 0}
             ]
         except:
             pass
@@ -610,8 +925,9 @@ def handle_connect():
     当客户端连接到WebSocket时，发送初始罐数据和MQTT连接状态
     """
     logger.info("WebSocket客户端已连接")
-    # 发送初始罐数据到客户端
-    emit('tank_data_update', tank_data)
+    refresh_tank_data()
+    # 发送初始罐数据到客户端，使用缓存的序列化快照避免每次连接都重新编码
+    emit('tank_data_update', get_tank_snapshot())
     # 发送当前MQTT连接状态到客户端
     global is_connected
     emit('mqtt_status', {'connected': is_connected})
@@ -622,9 +938,41 @@ def handle_disconnect():
     logger.info("WebSocket客户端已断开连接")
 
 # 误差处理相关函数
+def publish_adjustments():
+    """将所有罐的误差调整值发布到MQTT
+    
+    复用预先分配的调整数据对象，只刷新其中的误差值；
+    如果序列化结果与上次成功发布的内容相同则跳过发布。
+    
+    Returns:
+        bool: 发布成功或内容未变化时为True
+    """
+    global _last_adjustments_payload
+    adjustments = _adjustments_data['adjustments']
+    with tank_data_lock:
+        for i in TANK_IDS:
+            adjustments[i - 1]['adjustmentFactor'] = tank_data[i]['error'] if i in tank_data else 0.0
+        payload = orjson.dumps(_adjustments_data)
+    
+    if payload == _last_adjustments_payload:
+        logger.debug("误差调整数据与上次发布的内容相同，跳过发布")
+        return True
+    
+    info = mqtt_client_instance.publish(TOPIC_ADJUSTMENTS, payload, qos=1)
+    if info.rc != mqtt.MQTT_ERR_SUCCESS:
+        # 不记录本次负载，下次相同内容仍会重新发布
+        logger.error("[MQTT发布] 误差调整数据发布失败，主题: %s, 返回码: %s", TOPIC_ADJUSTMENTS, info.rc)
+        return False
+    _last_adjustments_payload = payload
+    logger.info("[MQTT发布] 主题: %s, 负载: 误差调整数据", TOPIC_ADJUSTMENTS)
+    return True
+
 @app.route('/api/tank/<int:tank_id>/error', methods=['POST'])
 def update_tank_error(tank_id):
     """更新罐的误差值并通过MQTT发布，支持3位小数点精度，最大调整值为罐的高度"""
+    # 多进程部署时误差数据由MQTT进程维护和发布，其余进程修改后既无法发布也会被覆盖
+    if not IS_MQTT_WORKER:
+        return jsonify({'success': False, 'message': '当前进程未连接MQTT服务器，请将误差更新请求发送到MQTT进程'}), 503
     try:
         data = request.get_json()
         error = float(data.get('error', 0))
@@ -641,29 +989,22 @@ def update_tank_error(tank_id):
                 error = tank_height if error > 0 else -tank_height
                 logger.warning(f"误差值 {error} 超过了罐 {tank_id} 的高度 {tank_height}，已自动调整")
             
-            tank_data[tank_id]['error'] = error
-            # 保存误差数据
+            # 误差值未变化时无需保存和重新发布
+            with tank_data_lock:
+                error_changed = set_tank_field(tank_data[tank_id], 'error', error)
+            if not error_changed:
+                return jsonify({'success': True, 'message': f'罐 {tank_id} 的误差值未变化，仍为 {error}'})
+            mark_tank_dirty(tank_id)
+            
+            # 保存误差数据并通知前端
             save_error_data()
+            queue_emit('tank_data_delta', pop_tank_delta)
             
-            # 发布所有罐的误差数据到MQTT
-            if mqtt_client_instance and is_connected:
-                # 构建误差调整数据格式
-                adjustments_data = {
-                    'adjustments': []
-                }
-                for i in range(1, current_config.MAX_TANKS + 1):
-                    adjustment = {
-                        'adjustmentFactor': tank_data[i]['error'] if i in tank_data else 0.0
-                    }
-                    adjustments_data['adjustments'].append(adjustment)
-                
-                # 发布到MQTT主题
-                topic = current_config.MQTT_TOPICS.get('adjustments', 'tanks/adjustments')
-                payload = json.dumps(adjustments_data)
-                mqtt_client_instance.publish(topic, payload, qos=1)
-                logger.info(f"[MQTT发布] 时间: {time.strftime('%Y-%m-%d %H:%M:%S')}, 主题: {topic}, 负载: 误差调整数据")
+            # 发布所有罐的误差数据到MQTT（协议要求包含所有罐的调整值）
+            if not (mqtt_client_instance and is_connected and publish_adjustments()):
+                return jsonify({'success': True, 'published': False, 'message': f'罐 {tank_id} 的误差值已更新为 {error}（3位小数，最大为罐高度 {tank_height}），但MQTT未连接或发布失败，未发布'})
             
-            return jsonify({'success': True, 'message': f'罐 {tank_id} 的误差值已更新为 {error}（3位小数，最大为罐高度 {tank_height}），并通过MQTT发布'})
+            return jsonify({'success': True, 'published': True, 'message': f'罐 {tank_id} 的误差值已更新为 {error}（3位小数，最大为罐高度 {tank_height}），并通过MQTT发布'})
         else:
             return jsonify({'success': False, 'message': f'罐 {tank_id} 不存在'}), 404
     except Exception as e:
@@ -671,27 +1012,32 @@ def update_tank_error(tank_id):
         return jsonify({'success': False, 'message': str(e)}), 500
 
 def save_error_data():
+    """标记误差数据需要保存，由后台保存任务合并写入文件"""
+    _error_save_pending.set()
+
+def write_error_data():
     """保存误差数据到文件"""
     try:
         error_data = {}
-        for tank_id, tank_info in tank_data.items():
-            error_data[tank_id] = tank_info.get('error', 0)
+        with tank_data_lock:
+            for tank_id, tank_info in tank_data.items():
+                error_data[tank_id] = tank_info.get('error', 0)
         
-        with open(current_config.ERROR_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(error_data, f, ensure_ascii=False, indent=2)
+        write_json_file(current_config.ERROR_DATA_FILE, error_data)
     except Exception as e:
         logger.error(f"保存误差数据时出错: {str(e)}")
 
 def load_error_data():
     """从文件加载误差数据"""
     try:
-        if os.path.exists(current_config.ERROR_DATA_FILE):
-            with open(current_config.ERROR_DATA_FILE, 'r', encoding='utf-8') as f:
-                error_data = json.load(f)
-                for tank_id, error in error_data.items():
-                    tank_id_int = int(tank_id)
-                    if tank_id_int in tank_data:
-                        tank_data[tank_id_int]['error'] = float(error)
+        with open(current_config.ERROR_DATA_FILE, 'rb') as f:
+            error_data = orjson.loads(f.read())
+        for tank_id, error in error_data.items():
+            tank_id_int = int(tank_id)
+            if tank_id_int in tank_data:
+                tank_data[tank_id_int]['error'] = float(error)
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.error(f"加载误差数据时出错: {str(e)}")
 
@@ -731,21 +1077,22 @@ def handle_publish_message(data):
         if mqtt_client_instance and is_connected and topic:
             # 确保payload是字符串
             if isinstance(payload, dict):
-                payload = json.dumps(payload)
+                payload = orjson.dumps(payload).decode('utf-8')
             elif not isinstance(payload, str):
                 payload = str(payload)
             
             mqtt_client_instance.publish(topic, payload, qos=qos, retain=retain)
             # 添加更详细的发布数据日志
-            logger.info(f"[MQTT发布] 时间: {time.strftime('%Y-%m-%d %H:%M:%S')}, 主题: {topic}, QoS: {qos}, 保留: {retain}, 负载: {payload}")
+            logger.info("[MQTT发布] 主题: %s, QoS: %s, 保留: %s, 负载: %s", topic, qos, retain, payload)
             
             # 特殊处理tanks/adjustments主题，确保发布后立即更新前端
-            if topic == current_config.MQTT_TOPICS.get('adjustments', 'tanks/adjustments'):
+            if topic == TOPIC_ADJUSTMENTS:
                 try:
                     # 解析发布的消息内容
-                    adjustments_data = json.loads(payload)
+                    adjustments_data = orjson.loads(payload)
                     # 直接调用update_tank_adjustments来更新数据并通知前端
-                    update_tank_adjustments(adjustments_data)
+                    with tank_data_lock:
+                        update_tank_adjustments(adjustments_data)
                 except Exception as e:
                     logger.error(f"处理发布的误差调整数据时出错: {str(e)}")
             
@@ -764,6 +1111,7 @@ def get_tanks_data():
     """获取当前所有罐数据的API端点"""
     try:
         global tank_data
+        refresh_tank_data()
         return jsonify({'success': True, 'data': tank_data})
     except Exception as e:
         logger.error(f"获取罐数据时出错: {str(e)}")
@@ -779,8 +1127,18 @@ def initialize_app():
     load_subscribed_data()
     load_error_data()
     
-    # 初始化MQTT客户端
-    initialize_mqtt_client()
+    # 启动SocketIO广播任务
+    if not disable_socketio:
+        socketio.start_background_task(emit_worker)
+    
+    # 初始化MQTT客户端。单进程模式下直接连接；多进程部署（配置了消息队列）时只由
+    # 显式设置WORKER_ID=0的进程连接，广播通过消息队列发送到所有进程
+    if IS_MQTT_WORKER:
+        # 数据文件只由MQTT进程写入，其余进程从文件读取
+        threading.Thread(target=save_worker, daemon=True).start()
+        initialize_mqtt_client()
+    else:
+        logger.info(f"已配置消息队列且WORKER_ID为{current_config.WORKER_ID}，当前进程不连接MQTT服务器，只读取MQTT进程保存的数据")
     
     # 初始化数据管理器
     data_manager = DataManager(
@@ -811,6 +1169,12 @@ def cleanup_resources(signum=None, frame=None):
         except Exception as e:
             logger.error(f"断开MQTT连接时出错: {str(e)}")
     
+    # 停止接收新的消息处理任务，等待正在处理的消息完成
+    _message_executor.shutdown(wait=True, cancel_futures=True)
+    
+    # 写入尚未保存的数据
+    flush_pending_saves()
+    
     logger.info("资源清理完成")
 
 # 注册信号处理程序，捕获终止信号
@@ -2,10 +2,18 @@
 # -*- coding: utf-8 -*-
 
 import os
+import functools
 from dotenv import load_dotenv
 
+
+@functools.lru_cache(maxsize=1)
+def init_env() -> bool:
+    """加载.env文件中的环境变量，整个进程只执行一次，已存在的环境变量不会被覆盖"""
+    return load_dotenv(override=False)
+
+
 # 加载环境变量
-load_dotenv()
+init_env()
 
 class Config:
     """基础配置类 - 定义应用程序的核心配置参数
@@ -32,6 +40,7 @@ class Config:
     MQTT_TLS_ENABLED = os.environ.get('MQTT_USE_TLS', 'False').lower() == 'true'  # 是否启用TLS
     MQTT_USE_WEBSOCKETS = os.environ.get('MQTT_USE_WEBSOCKETS', 'False').lower() == 'true'  # 是否使用WebSocket
     MQTT_WEBSOCKET_PATH = os.environ.get('MQTT_WEBSOCKET_PATH', '/mqtt')  # WebSocket路径
+    MQTT_MESSAGE_WORKERS = int(os.environ.get('MQTT_MESSAGE_WORKERS', 1))  # 消息处理线程数，大于1时不保证处理顺序
     
     # MQTT主题配置
     MQTT_TOPICS = {
@@ -47,11 +56,27 @@ class Config:
     SUBSCRIBED_DATA_FILE = os.path.join(DATA_FOLDER, 'subscribed_mqtt_data.json')
     HISTORY_FILE = os.path.join(DATA_FOLDER, os.environ.get('HISTORY_FILE', 'tank_history.json'))  # 历史数据文件名
     MAX_HISTORY_POINTS = int(os.environ.get('MAX_HISTORY_POINTS', 1000))  # 最大历史数据点
+    DATA_SAVE_INTERVAL = float(os.environ.get('DATA_SAVE_INTERVAL', 1.0))  # 数据文件合并保存间隔（秒）
+    HISTORY_SAVE_INTERVAL = float(os.environ.get('HISTORY_SAVE_INTERVAL', 2.0))  # 历史数据追加日志刷新间隔（秒）
+    HISTORY_COMPACT_INTERVAL = float(os.environ.get('HISTORY_COMPACT_INTERVAL', 3600.0))  # 追加日志合并到快照的间隔（秒）
     
     # 监控配置
     MAX_TANKS = int(os.environ.get('MAX_TANKS', 11))                 # 最大罐数量
     DEFAULT_TANK_HEIGHT = float(os.environ.get('DEFAULT_TANK_HEIGHT', 8.0))  # 默认罐高度（米）
     HIGH_LEVEL_THRESHOLD_PERCENTAGE = float(os.environ.get('HIGH_LEVEL_THRESHOLD_PERCENTAGE', 0.8))  # 高液位报警阈值（80%）
+    ALARM_HYSTERESIS = float(os.environ.get('ALARM_HYSTERESIS', 0.02))  # 解除报警需低于高限的比例（2%）
+    ALARM_COOLDOWN = float(os.environ.get('ALARM_COOLDOWN', 1.0))       # 同一罐重复报警的最小间隔（秒）
+    
+    # SocketIO配置
+    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'eventlet').lower()  # 异步模式: eventlet, gevent 或 threading
+    SOCKETIO_EMIT_INTERVAL_MS = int(os.environ.get('SOCKETIO_EMIT_INTERVAL_MS', 50))  # 广播合并窗口（毫秒）
+    SOCKETIO_EMIT_BATCH_SIZE = int(os.environ.get('SOCKETIO_EMIT_BATCH_SIZE', 20))    # 单个合并窗口最多收集的事件数
+    SOCKETIO_EMIT_QUEUE_SIZE = int(os.environ.get('SOCKETIO_EMIT_QUEUE_SIZE', 2000))  # 广播队列最大长度
+    # 多进程部署时用于协调广播的消息队列，例如 redis://localhost:6379/0，未设置时为单进程模式
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+    # 配置了消息队列（多进程部署）时，只有显式设置WORKER_ID=0的进程连接MQTT服务器。
+    # 默认不设置：gunicorn等fork出的工作进程共享同一环境变量，默认值会使所有进程都订阅
+    WORKER_ID = os.environ.get('WORKER_ID') or None
     
     # 日志配置
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')  # 日志级别
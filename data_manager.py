@@ -1,22 +1,245 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
 import os
 import logging
+import re
+import sys
+import ijson
+import orjson
 import pandas as pd
 import numpy as np
 import time  # 添加time模块导入
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+import atexit
+import queue
+from collections import Counter, deque
+from datetime import datetime
+from types import MappingProxyType
+from typing import Deque, Dict, List, Any, Optional, Tuple, Iterable
 import threading
 
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖，未安装时使用NumPy计算统计信息
+    njit = None
+
 # 导入项目配置
 from config import current_config
 
 # 配置日志
 logger = logging.getLogger('DataManager')
 
+# 历史记录状态编码，环形缓冲区中以uint8存储
+STATUS_NAMES = ('normal', 'warning', 'alert')
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+STATUS_INTERN = {name: name for name in STATUS_NAMES}  # 加载时将状态字符串替换为共享的常量
+
+# 罐数据字段与消息中可能使用的字段名，按优先级排列
+FIELD_ALIASES = (
+    ('temperature', ('temperature', 'temp')),
+    ('level', ('level', 'height', 'liquid_level')),
+    ('pressure', ('pressure',)),
+    ('error', ('error',)),
+)
+
+# 主题中的罐ID：以tank_开头或全部为数字的层级
+TANK_ID_PATTERN = re.compile(r'(?:^|/)(tank_[^/]*|\d+)(?=/|$)')
+
+# 每分钟/每天的微秒数
+US_PER_MINUTE = 60 * 1000000
+US_PER_DAY = 24 * 60 * US_PER_MINUTE
+
+
+def now_us() -> int:
+    """返回当前Unix时间戳（微秒）"""
+    return time.time_ns() // 1000
+
+
+def iso_to_us(value: str) -> int:
+    """将ISO格式时间字符串转换为Unix时间戳（微秒），不带时区的按本地时间处理"""
+    dt = datetime.fromisoformat(value)
+    # 整秒部分单独转换，避免浮点误差影响微秒精度
+    return int(dt.replace(microsecond=0).timestamp()) * 1000000 + dt.microsecond
+
+
+def us_to_iso(value: int) -> str:
+    """将Unix时间戳（微秒）转换为本地时间的ISO格式字符串"""
+    seconds, micros = divmod(value, 1000000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=micros).isoformat()
+
+
+def _history_stats_loop(temperature: np.ndarray, level: np.ndarray, status: np.ndarray) -> Tuple:
+    """单次遍历计算温度、液位的平均值/最小值/最大值及警报数量，缺失值（NaN）不参与统计"""
+    t_sum = 0.0
+    t_count = 0
+    t_min = np.inf
+    t_max = -np.inf
+    l_sum = 0.0
+    l_count = 0
+    l_min = np.inf
+    l_max = -np.inf
+    alert_count = 0
+    for i in range(status.shape[0]):
+        t = temperature[i]
+        if t == t:
+            t_sum += t
+            t_count += 1
+            t_min = min(t_min, t)
+            t_max = max(t_max, t)
+        v = level[i]
+        if v == v:
+            l_sum += v
+            l_count += 1
+            l_min = min(l_min, v)
+            l_max = max(l_max, v)
+        if status[i] != 0:
+            alert_count += 1
+    
+    if t_count == 0:
+        t_min = t_max = np.nan
+    if l_count == 0:
+        l_min = l_max = np.nan
+    return (t_sum / t_count if t_count else np.nan, t_min, t_max,
+            l_sum / l_count if l_count else np.nan, l_min, l_max, alert_count)
+
+
+def _history_stats_numpy(temperature: np.ndarray, level: np.ndarray, status: np.ndarray) -> Tuple:
+    """与_history_stats_loop结果相同的NumPy实现"""
+    if np.isnan(temperature).all():
+        t_stats = (np.nan, np.nan, np.nan)
+    else:
+        t_stats = (np.nanmean(temperature), np.nanmin(temperature), np.nanmax(temperature))
+    if np.isnan(level).all():
+        l_stats = (np.nan, np.nan, np.nan)
+    else:
+        l_stats = (np.nanmean(level), np.nanmin(level), np.nanmax(level))
+    return t_stats + l_stats + (np.count_nonzero(status),)
+
+
+# 安装了numba时将统计循环编译为机器码，否则使用NumPy向量化计算
+_history_stats = njit(cache=True)(_history_stats_loop) if njit is not None else _history_stats_numpy
+
+
+class TankRing:
+    """单个罐的历史数据环形缓冲区
+    
+    历史记录按列存储在预分配的NumPy数组中：时间戳为int64微秒，温度、液位、压力为float64
+    （缺失值为NaN），状态为uint8编码。写满后新记录覆盖最旧的记录。
+    记录按接收顺序追加，时间戳单调递增，按时间查找时使用二分查找。
+    """
+    
+    __slots__ = ('capacity', 'ts', 'temperature', 'level', 'pressure', 'status', 'head', 'count')
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.temperature = np.empty(capacity, dtype=np.float64)
+        self.level = np.empty(capacity, dtype=np.float64)
+        self.pressure = np.empty(capacity, dtype=np.float64)
+        self.status = np.empty(capacity, dtype=np.uint8)
+        self.head = 0   # 下一条记录的写入位置
+        self.count = 0  # 有效记录数量
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, entry: Dict[str, Any]) -> None:
+        """追加一条历史记录（字典格式），优先使用微秒时间戳ts，没有时解析ISO格式的timestamp"""
+        i = self.head
+        ts = entry.get('ts')
+        self.ts[i] = iso_to_us(entry['timestamp']) if ts is None else ts
+        temperature = entry.get('temperature')
+        self.temperature[i] = np.nan if temperature is None else temperature
+        level = entry.get('level')
+        self.level[i] = np.nan if level is None else level
+        pressure = entry.get('pressure')
+        self.pressure[i] = np.nan if pressure is None else pressure
+        self.status[i] = STATUS_CODES.get(entry.get('status'), 0)
+        
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+    
+    def clear(self) -> None:
+        """清空所有记录"""
+        self.head = 0
+        self.count = 0
+    
+    def _ordered(self, column: np.ndarray) -> np.ndarray:
+        """按时间顺序返回某一列的有效数据，未回绕时返回视图"""
+        start = self.head - self.count
+        if start >= 0:
+            return column[start:self.head]
+        return np.concatenate((column[start:], column[:self.head]))
+    
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """按时间顺序返回时间戳、温度、液位、压力和状态列"""
+        return (self._ordered(self.ts), self._ordered(self.temperature), self._ordered(self.level),
+                self._ordered(self.pressure), self._ordered(self.status))
+    
+    def drop_before(self, cutoff_us: int) -> int:
+        """删除时间戳早于cutoff_us的最旧记录，返回删除的数量"""
+        start = self.head - self.count
+        if start >= 0:
+            removed = int(np.searchsorted(self.ts[start:self.head], cutoff_us))
+        else:
+            # 已回绕：先在较旧的尾段中查找，全部过期时再查找头段
+            older = self.ts[start:]
+            removed = int(np.searchsorted(older, cutoff_us))
+            if removed == len(older):
+                removed += int(np.searchsorted(self.ts[:self.head], cutoff_us))
+        
+        # 最旧的记录位于head之前count个位置，减少count即可丢弃
+        self.count -= removed
+        return removed
+    
+    def resized(self, capacity: int) -> 'TankRing':
+        """返回指定容量的新缓冲区，超出容量时只保留最新的记录"""
+        ring = TankRing(capacity)
+        n = min(self.count, capacity)
+        for dst, src in zip((ring.ts, ring.temperature, ring.level, ring.pressure, ring.status), self.columns()):
+            dst[:n] = src[len(src) - n:]
+        ring.head = n % capacity
+        ring.count = n
+        return ring
+    
+    def select(self, start_us: int = None, end_us: int = None, limit: int = None) -> Tuple[np.ndarray, ...]:
+        """按时间范围和数量选取记录，返回各列的副本
+        
+        Args:
+            start_us: 开始时间（微秒时间戳），包含该时间
+            end_us: 结束时间（微秒时间戳），包含该时间
+            limit: 返回的记录数量限制，优先取最新的记录
+        """
+        columns = self.columns()
+        ts = columns[0]
+        lo = 0 if start_us is None else np.searchsorted(ts, start_us, side='left')
+        hi = len(ts) if end_us is None else np.searchsorted(ts, end_us, side='right')
+        if limit:
+            lo = max(lo, hi - limit)
+        # 复制选中的部分，之后的追加写入不会影响返回的数据
+        return tuple(column[lo:hi].copy() for column in columns)
+    
+    @staticmethod
+    def columns_to_records(columns: Tuple[np.ndarray, ...]) -> List[Dict[str, Any]]:
+        """将select返回的各列转换为字典列表"""
+        ts, temperature, level, pressure, status = (column.tolist() for column in columns)
+        return [
+            {
+                'timestamp': us_to_iso(t),
+                'temperature': temp if temp == temp else None,  # NaN表示缺失值
+                'level': lvl if lvl == lvl else None,
+                'pressure': pres if pres == pres else None,
+                'status': STATUS_NAMES[code]
+            }
+            for t, temp, lvl, pres, code in zip(ts, temperature, level, pressure, status)
+        ]
+    
+    def to_records(self, start_us: int = None, end_us: int = None, limit: int = None) -> List[Dict[str, Any]]:
+        """将记录转换为字典列表，参数同select"""
+        return self.columns_to_records(self.select(start_us, end_us, limit))
+
+
 class DataManager:
     """数据管理类，负责处理、存储和分析从MQTT接收的储罐数据"""
     
@@ -32,14 +255,16 @@ class DataManager:
         self.data_dir = data_dir
         self.history_file = history_file
         self.history_file_path = os.path.join(self.data_dir, self.history_file)
+        # 追加日志：每次更新追加一行JSON记录，定期合并到历史数据快照文件
+        self.wal_file_path = os.path.splitext(self.history_file_path)[0] + '.jsonl'
         
         # 确保数据目录存在
         os.makedirs(self.data_dir, exist_ok=True)
         
         # 数据存储
         self.tanks_data: Dict[str, Dict[str, Any]] = {}
-        self.tanks_history: Dict[str, List[Dict[str, Any]]] = {}
-        self.alerts: List[Dict[str, Any]] = []
+        self.tanks_history: Dict[str, TankRing] = {}
+        self.alerts: Deque[Dict[str, Any]] = deque(maxlen=100)  # 保留最近的100条警报
         
         # 配置参数
         self.max_history_points = getattr(current_config, 'MAX_HISTORY_POINTS', 10000)  # 每个罐保存的历史数据点数量
@@ -50,64 +275,254 @@ class DataManager:
         self.error_threshold = 0.5      # 误差阈值
         self.storage_days = storage_days  # 数据存储天数
         self.default_tank_height = getattr(current_config, 'DEFAULT_TANK_HEIGHT', 8.0)  # 默认罐高度
+        self.save_interval = getattr(current_config, 'HISTORY_SAVE_INTERVAL', 2.0)  # 追加日志刷新间隔（秒）
+        self.compact_interval = getattr(current_config, 'HISTORY_COMPACT_INTERVAL', 3600.0)  # 快照合并间隔（秒）
+        self.cleanup_interval = 3600  # 过期数据清理间隔（秒）
         
         # 锁，用于线程安全
         self.data_lock = threading.Lock()
         
+        # 各状态的罐数量和最后更新时间，随数据更新维护，避免查询整体状态时遍历所有罐
+        self._status_counts: Counter = Counter()
+        self._last_update_time: Optional[str] = None
+        
+        # 单写线程模型：MQTT消息解析后放入队列，由写入线程批量更新状态；
+        # 读取方通过只读快照访问罐数据，无需获取data_lock
+        self._in_q: queue.Queue = queue.Queue(maxsize=10000)
+        self._tanks_view = MappingProxyType({})
+        
+        # 待刷新标记和待合并标记，由后台写入线程处理
+        self._dirty = threading.Event()
+        self._compact_pending = threading.Event()
+        
         # 加载历史数据
         self._load_history_data()
+        self._recount_status()
+        self._publish_view()
         
         # 立即执行一次清理，移除过期数据
         self._cleanup_expired_data()
         
-        # 启动定期清理任务
-        self._start_cleanup_task()
+        # 打开追加日志，后续更新只追加记录，不再重写整个文件
+        self._wal = open(self.wal_file_path, 'ab')
+        
+        # 启动数据更新线程
+        self._start_ingest_task()
+        
+        # 启动后台写入线程（同时负责定期清理），并在程序退出时写入尚未保存的数据
+        self._start_writer_task()
+        atexit.register(self._flush_history_data)
     
     def _load_history_data(self) -> None:
         """从文件加载历史数据到内存
         
         该方法尝试从配置的历史数据文件中加载储罐的当前数据、历史记录和存储天数配置。
+        历史记录使用ijson按罐流式解析，只保留未过期且不超过最大数量的记录，
+        避免一次性把整个文件解析到内存中。
         如果文件不存在或读取解析失败，将记录错误日志但不会中断程序运行，确保系统能够继续工作。
         加载成功后会记录包含的储罐数量信息。
         """
         try:
             if os.path.exists(self.history_file_path):
-                with open(self.history_file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # 恢复罐数据和历史数据
-                    if 'tanks_data' in data:
-                        self.tanks_data = data['tanks_data']
-                    if 'tanks_history' in data:
-                        self.tanks_history = data['tanks_history']
-                    # 恢复存储天数配置
-                    if 'storage_days' in data:
-                        self.storage_days = data['storage_days']
+                with open(self.history_file_path, 'rb') as f:
+                    # 恢复存储天数配置（快照中位于开头，读到即停止）
+                    storage_days = next(ijson.items(f, 'storage_days'), None)
+                    if storage_days is not None:
+                        self.storage_days = storage_days
+                    
+                    # 恢复罐数据
+                    f.seek(0)
+                    tanks_data = next(ijson.items(f, 'tanks_data', use_float=True), None)
+                    if tanks_data is not None:
+                        # 驻留罐ID、字段名和状态字符串，避免每个罐各持有一份相同的字符串
+                        self.tanks_data = {}
+                        for tank_id, tank in tanks_data.items():
+                            # 旧版本保存了原始消息，不再需要
+                            tank.pop('raw_data', None)
+                            tank = {sys.intern(key): value for key, value in tank.items()}
+                            status = tank.get('status')
+                            if status is not None:
+                                tank['status'] = STATUS_INTERN.get(status, status)
+                            self.tanks_data[sys.intern(tank_id)] = tank
+                    
+                    # 逐个罐恢复历史数据，过期记录随后由_cleanup_expired_data按时间戳清理
+                    f.seek(0)
+                    for tank_id, history in ijson.kvitems(f, 'tanks_history', use_float=True):
+                        self.tanks_history[sys.intern(tank_id)] = self._new_history(history)
                 logger.info(f"已加载历史数据，包含 {len(self.tanks_data)} 个罐的数据")
         except Exception as e:
             logger.error(f"加载历史数据时出错: {str(e)}")
+        
+        # 快照之后的更新记录在追加日志中，需要重放
+        self._replay_wal()
+    
+    def _replay_wal(self) -> None:
+        """重放追加日志中快照之后的历史记录"""
+        replayed = 0
+        try:
+            with open(self.wal_file_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # 进程异常退出时最后一行可能不完整，跳过即可
+                        logger.warning("追加日志中存在无法解析的记录，已跳过")
+                        continue
+                    
+                    tank_id = str(record.pop('tank_id'))
+                    if tank_id not in self.tanks_history:
+                        self.tanks_history[tank_id] = self._new_history()
+                    self.tanks_history[tank_id].append(record)
+                    # 同步罐的最新读数
+                    if tank_id in self.tanks_data:
+                        tank = self.tanks_data[tank_id]
+                        tank.update(record)
+                        if 'ts' in record:
+                            tank['timestamp'] = us_to_iso(record['ts'])
+                    replayed += 1
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"重放追加日志时出错: {str(e)}")
+        
+        if replayed:
+            logger.info(f"已从追加日志恢复 {replayed} 条历史记录")
     
     def _save_history_data(self) -> None:
-        """将内存中的历史数据保存到文件
+        """将内存中的历史数据合并保存到快照文件
         
         该方法使用线程锁确保数据一致性，将当前所有储罐数据、历史记录和存储天数配置保存到文件中。
-        保存过程中会记录当前时间戳，便于后续追踪数据更新情况。
+        快照先写入临时文件再替换原文件，写入完成后清空追加日志，整个过程持有锁，
+        保证快照与追加日志之间不会丢失或重复记录。
         如果保存过程中发生异常，将记录错误日志但不会中断程序运行。
         """
         try:
             with self.data_lock:
+                # storage_days和tanks_data放在tanks_history之前，加载时无需扫描整个文件
                 data_to_save = {
-                    'tanks_data': self.tanks_data,
-                    'tanks_history': self.tanks_history,
                     'storage_days': self.storage_days,
+                    'tanks_data': self.tanks_data,
+                    'tanks_history': {tid: history.to_records() for tid, history in self.tanks_history.items()},
                     'timestamp': datetime.now().isoformat()
                 }
                 
-            with open(self.history_file_path, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=2)
-            logger.debug("历史数据已保存")
+                tmp_path = self.history_file_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(data_to_save, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+                os.replace(tmp_path, self.history_file_path)
+                
+                # 快照已包含全部记录，清空追加日志
+                self._wal.truncate(0)
+            logger.debug("历史数据快照已保存")
         except Exception as e:
             logger.error(f"保存历史数据时出错: {str(e)}")
     
+    def _recount_status(self) -> None:
+        """根据当前罐数据重新统计各状态的罐数量和最后更新时间，调用方需持有data_lock（初始化时除外）"""
+        self._status_counts = Counter(tank.get('status', 'normal') for tank in self.tanks_data.values())
+        self._last_update_time = max(tank.get('timestamp', '') for tank in self.tanks_data.values()) if self.tanks_data else None
+    
+    def _publish_view(self) -> None:
+        """发布当前罐数据的只读快照，调用方需持有data_lock（初始化时除外）"""
+        self._tanks_view = MappingProxyType(dict(self.tanks_data))
+    
+    def _start_ingest_task(self) -> None:
+        """启动数据更新线程
+        
+        更新线程是唯一写入罐数据的线程：每次取出队列中已有的全部消息（最多500条），
+        在一次加锁内批量更新，然后发布新的只读快照。
+        """
+        def ingest_task():
+            while True:
+                batch = [self._in_q.get()]
+                try:
+                    while len(batch) < 500:
+                        batch.append(self._in_q.get_nowait())
+                except queue.Empty:
+                    pass
+                
+                try:
+                    self._apply_tank_updates(batch)
+                except Exception as e:
+                    logger.error(f"批量更新罐数据时出错: {str(e)}")
+        
+        ingest_thread = threading.Thread(target=ingest_task, daemon=True)
+        ingest_thread.start()
+    
+    def _new_history(self, entries: Iterable[Dict[str, Any]] = ()) -> TankRing:
+        """创建单个罐的历史数据缓冲区，超过最大数据点数量时自动覆盖最旧的记录"""
+        ring = TankRing(self.max_history_points)
+        for entry in entries:
+            ring.append(entry)
+        return ring
+    
+    def _append_wal(self, tank_id: str, history_entry: Dict[str, Any]) -> None:
+        """向追加日志写入一条历史记录，调用方需持有data_lock"""
+        record = {'tank_id': tank_id}
+        record.update(history_entry)
+        self._wal.write(orjson.dumps(record) + b'\n')
+    
+    def _flush_wal(self) -> None:
+        """将追加日志缓冲区写入文件"""
+        with self.data_lock:
+            self._wal.flush()
+    
+    def _request_save(self) -> None:
+        """标记追加日志需要刷新，由后台写入线程在保存间隔内合并刷新"""
+        self._dirty.set()
+    
+    def _request_compaction(self) -> None:
+        """标记需要重写快照文件，用于清除、移除等无法通过追加日志表达的修改"""
+        self._compact_pending.set()
+        self._dirty.set()
+    
+    def _flush_history_data(self) -> None:
+        """程序退出时应用队列中剩余的更新，并合并追加日志到快照文件"""
+        pending = []
+        try:
+            while True:
+                pending.append(self._in_q.get_nowait())
+        except queue.Empty:
+            pass
+        if pending:
+            self._apply_tank_updates(pending)
+        
+        self._dirty.clear()
+        self._compact_pending.clear()
+        self._save_history_data()
+    
+    def _start_writer_task(self) -> None:
+        """启动后台写入线程
+        
+        写入线程等待保存标记，被唤醒后再等待一个保存间隔，将该间隔内追加的记录一次刷新到文件；
+        每隔合并间隔（或收到合并请求时）将追加日志合并到快照文件，避免每条消息都重写整个文件。
+        同一线程每隔清理间隔清理所有罐的过期数据，不再单独占用一个清理线程。
+        """
+        def writer_task():
+            last_compaction = last_cleanup = time.monotonic()
+            wait_timeout = min(self.compact_interval, self.cleanup_interval)
+            while True:
+                try:
+                    if self._dirty.wait(timeout=wait_timeout):
+                        time.sleep(self.save_interval)
+                        self._dirty.clear()
+                    
+                    if time.monotonic() - last_cleanup >= self.cleanup_interval:
+                        self._cleanup_expired_data()
+                        last_cleanup = time.monotonic()
+                    
+                    if self._compact_pending.is_set() or time.monotonic() - last_compaction >= self.compact_interval:
+                        self._compact_pending.clear()
+                        self._save_history_data()
+                        last_compaction = time.monotonic()
+                    else:
+                        self._flush_wal()
+                except Exception as e:
+                    logger.error(f"执行历史数据写入任务时出错: {str(e)}")
+        
+        writer_thread = threading.Thread(target=writer_task, daemon=True)
+        writer_thread.start()
+    
     def process_mqtt_message(self, topic: str, payload: str) -> Optional[Dict[str, Any]]:
         """处理MQTT消息
         
@@ -116,14 +531,17 @@ class DataManager:
             payload: MQTT消息负载
         
         Returns:
-            Optional[Dict[str, Any]]: 处理后的罐数据，如果解析失败则返回None
+            Optional[Dict[str, Any]]: 解析后的罐数据（状态更新由数据更新线程异步完成），如果解析失败则返回None
         """
+        # 每条消息只取一次当前时间，解析和报警共用
+        ts = now_us()
+        
         try:
             # 尝试解析JSON消息
             if isinstance(payload, dict):
                 message = payload
             else:
-                message = json.loads(payload)
+                message = orjson.loads(payload)
             
             # 提取罐数据
             tank_id = self._extract_tank_id(topic, message)
@@ -132,14 +550,14 @@ class DataManager:
                 return None
             
             # 解析罐数据
-            tank_data = self._parse_tank_data(tank_id, message)
+            tank_data = self._parse_tank_data(tank_id, message, ts)
             if not tank_data:
                 return None
             
-            # 更新罐数据
-            updated_data = self.update_tank_data(tank_id, tank_data)
-            return updated_data
-        except json.JSONDecodeError as e:
+            # 交给数据更新线程处理，立即返回
+            self._in_q.put((tank_id, tank_data))
+            return tank_data
+        except orjson.JSONDecodeError as e:
             logger.error(f"解析MQTT消息JSON时出错: {str(e)}, 消息: {payload[:100]}...")
         except Exception as e:
             logger.error(f"处理MQTT消息时出错: {str(e)}")
@@ -156,70 +574,55 @@ class DataManager:
         Returns:
             Optional[str]: 罐ID
         """
+        # 罐ID会作为字典键反复使用，驻留后每条消息共享同一个字符串对象
         # 尝试从主题中提取
-        topic_parts = topic.split('/')
-        for part in topic_parts:
-            if part.startswith('tank_') or part.isdigit():
-                return part
+        match = TANK_ID_PATTERN.search(topic)
+        if match:
+            return sys.intern(match.group(1))
         
         # 尝试从消息中提取
         if 'tank_id' in message:
-            return str(message['tank_id'])
+            return sys.intern(str(message['tank_id']))
         if 'id' in message:
-            return str(message['id'])
+            return sys.intern(str(message['id']))
         
         # 默认使用主题最后一部分
-        if topic_parts:
-            return topic_parts[-1]
-        
-        return None
+        return sys.intern(topic.rpartition('/')[2])
     
-    def _parse_tank_data(self, tank_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_tank_data(self, tank_id: str, message: Dict[str, Any], ts: int = None) -> Dict[str, Any]:
         """解析罐数据
         
         Args:
             tank_id: 罐ID
             message: 解析后的消息数据
+            ts: 接收时间（微秒时间戳），为None时使用当前时间
         
         Returns:
             Dict[str, Any]: 标准化的罐数据
         """
-        timestamp = datetime.now().isoformat()
+        if ts is None:
+            ts = now_us()
         
         # 标准化数据格式
         tank_data = {
             'tank_id': tank_id,
-            'timestamp': timestamp,
+            'timestamp': us_to_iso(ts),
+            'ts': ts,
             'temperature': None,
             'level': None,
             'pressure': None,
             'error': None,
             'status': 'normal',  # normal, warning, alert
-            'alert_message': '',
-            'raw_data': message
+            'alert_message': ''
         }
         
-        # 尝试提取温度数据
-        if 'temperature' in message:
-            tank_data['temperature'] = float(message['temperature'])
-        elif 'temp' in message:
-            tank_data['temperature'] = float(message['temp'])
-        
-        # 尝试提取液位数据
-        if 'level' in message:
-            tank_data['level'] = float(message['level'])
-        elif 'height' in message:
-            tank_data['level'] = float(message['height'])
-        elif 'liquid_level' in message:
-            tank_data['liquid_level'] = float(message['liquid_level'])
-        
-        # 尝试提取压力数据
-        if 'pressure' in message:
-            tank_data['pressure'] = float(message['pressure'])
-        
-        # 尝试提取误差数据
-        if 'error' in message:
-            tank_data['error'] = float(message['error'])
+        # 按字段别名表提取温度、液位、压力和误差数据
+        for field, aliases in FIELD_ALIASES:
+            for alias in aliases:
+                value = message.get(alias)
+                if value is not None:
+                    tank_data[field] = float(value)
+                    break
         
         # 检查数据有效性
         if tank_data['temperature'] is not None or tank_data['level'] is not None:
@@ -236,36 +639,53 @@ class DataManager:
         Args:
             tank_data: 罐数据
         """
+        if self._evaluate_alerts(tank_data):
+            # 添加到警报列表
+            self.add_alert(tank_data)
+    
+    def _evaluate_alerts(self, tank_data: Dict[str, Any]) -> bool:
+        """按当前阈值更新罐数据的状态和警报信息，不写入警报列表
+        
+        Args:
+            tank_data: 罐数据
+        
+        Returns:
+            bool: 是否处于警告或警报状态
+        """
         alerts = []
+        severity = 0  # 0b01: warning，0b10: alert
         
         # 检查温度
         if tank_data['temperature'] is not None:
             if tank_data['temperature'] > self.temp_threshold_high:
                 alerts.append(f"温度过高: {tank_data['temperature']}°C")
+                severity |= 2
             elif tank_data['temperature'] < self.temp_threshold_low:
                 alerts.append(f"温度过低: {tank_data['temperature']}°C")
+                severity |= 2
         
         # 检查液位
         if tank_data['level'] is not None:
             if tank_data['level'] > self.level_threshold_high:
                 alerts.append(f"液位过高: {tank_data['level']}%")
+                severity |= 2
             elif tank_data['level'] < self.level_threshold_low:
                 alerts.append(f"液位过低: {tank_data['level']}%")
+                severity |= 2
         
         # 检查误差
         if tank_data['error'] is not None and tank_data['error'] > self.error_threshold:
             alerts.append(f"误差过大: {tank_data['error']}")
+            severity |= 1
         
         # 更新状态
-        if alerts:
-            tank_data['status'] = 'alert' if any('过高' in alert or '过低' in alert for alert in alerts) else 'warning'
+        if severity:
+            tank_data['status'] = 'alert' if severity & 2 else 'warning'
             tank_data['alert_message'] = '; '.join(alerts)
-            
-            # 添加到警报列表
-            self.add_alert(tank_data)
-        else:
-            tank_data['status'] = 'normal'
-            tank_data['alert_message'] = ''
+            return True
+        tank_data['status'] = 'normal'
+        tank_data['alert_message'] = ''
+        return False
     
     def add_alert(self, tank_data: Dict[str, Any]) -> None:
         """添加警报到警报列表
@@ -273,9 +693,18 @@ class DataManager:
         Args:
             tank_data: 罐数据
         """
+        # 使用罐数据自身的时间，避免再次获取和格式化当前时间
+        ts = tank_data.get('ts')
+        if ts is None:
+            ts = now_us()
+            timestamp = us_to_iso(ts)
+        else:
+            timestamp = tank_data['timestamp']
+        
         alert = {
             'tank_id': tank_data['tank_id'],
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
+            'ts': ts,
             'status': tank_data['status'],
             'message': tank_data['alert_message'],
             'data': {
@@ -287,10 +716,8 @@ class DataManager:
         }
         
         with self.data_lock:
+            # 队列只保留最近的100条警报
             self.alerts.append(alert)
-            # 保留最近的100条警报
-            if len(self.alerts) > 100:
-                self.alerts = self.alerts[-100:]
         
         logger.warning(f"警报 - {tank_data['tank_id']}: {tank_data['alert_message']}")
     
@@ -304,35 +731,52 @@ class DataManager:
         Returns:
             Dict[str, Any]: 更新后的罐数据
         """
+        self._apply_tank_updates(((tank_id, tank_data),))
+        return tank_data
+    
+    def _apply_tank_updates(self, updates: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """在一次加锁内依次应用多条罐数据更新，并发布新的只读快照
+        
+        Args:
+            updates: (罐ID, 罐数据) 序列
+        """
+        cutoff_us = now_us() - self.storage_days * US_PER_DAY
+        
         with self.data_lock:
-            # 更新当前数据
-            self.tanks_data[tank_id] = tank_data
-            
-            # 更新历史数据
-            if tank_id not in self.tanks_history:
-                self.tanks_history[tank_id] = []
-            
-            # 添加到历史数据（只保留重要字段）
-            history_entry = {
-                'timestamp': tank_data['timestamp'],
-                'temperature': tank_data['temperature'],
-                'level': tank_data['level'],
-                'pressure': tank_data['pressure'],
-                'status': tank_data['status']
-            }
-            self.tanks_history[tank_id].append(history_entry)
-            
-            # 限制历史数据点数量
-            if len(self.tanks_history[tank_id]) > self.max_history_points:
-                self.tanks_history[tank_id] = self.tanks_history[tank_id][-self.max_history_points:]
+            for tank_id, tank_data in updates:
+                # 更新当前数据，并同步状态计数
+                previous = self.tanks_data.get(tank_id)
+                if previous is not None:
+                    self._status_counts[previous.get('status', 'normal')] -= 1
+                self._status_counts[tank_data['status']] += 1
+                self._last_update_time = tank_data['timestamp']
+                self.tanks_data[tank_id] = tank_data
+                
+                # 更新历史数据
+                if tank_id not in self.tanks_history:
+                    self.tanks_history[tank_id] = self._new_history()
+                history = self.tanks_history[tank_id]
+                
+                # 添加到历史数据（只保留重要字段）
+                ts = tank_data.get('ts')
+                history_entry = {
+                    'ts': iso_to_us(tank_data['timestamp']) if ts is None else ts,
+                    'temperature': tank_data['temperature'],
+                    'level': tank_data['level'],
+                    'pressure': tank_data['pressure'],
+                    'status': tank_data['status']
+                }
+                # 超过最大数据点数量时缓冲区自动覆盖最旧的记录
+                history.append(history_entry)
+                self._append_wal(tank_id, history_entry)
+                
+                # 清理该罐的过期数据
+                history.drop_before(cutoff_us)
             
-            # 清理过期数据
-            self._cleanup_expired_data(tank_id)
-        
-        # 异步保存数据
-        threading.Thread(target=self._save_history_data).start()
+            self._publish_view()
         
-        return tank_data
+        # 由后台写入线程合并刷新
+        self._request_save()
     
     def get_tank_data(self, tank_id: str = None) -> Dict[str, Any] or Dict[str, Dict[str, Any]]:
         """获取罐数据
@@ -343,11 +787,12 @@ class DataManager:
         Returns:
             Dict[str, Any] or Dict[str, Dict[str, Any]]: 罐数据
         """
-        with self.data_lock:
-            if tank_id:
-                return self.tanks_data.get(tank_id, {})
-            else:
-                return self.tanks_data.copy()
+        # 读取只读快照，无需加锁
+        view = self._tanks_view
+        if tank_id:
+            return view.get(tank_id, {})
+        else:
+            return dict(view)
     
     def get_tank_history(self, tank_id: str, start_time: str = None, end_time: str = None, limit: int = None) -> List[Dict[str, Any]]:
         """获取罐的历史数据
@@ -361,26 +806,22 @@ class DataManager:
         Returns:
             List[Dict[str, Any]]: 历史数据列表
         """
+        # 时间范围转换为微秒时间戳后在缓冲区中过滤
+        start_us = iso_to_us(start_time) if start_time else None
+        end_us = iso_to_us(end_time) if end_time else None
+        
+        # 限制返回的数据点数量，优先取最新的数据点
+        if not (limit and isinstance(limit, int) and limit > 0):
+            limit = None
+        
+        # 持有锁时只复制选中范围的数组，释放锁后再构建字典列表
         with self.data_lock:
             if tank_id not in self.tanks_history:
                 return []
             
-            history = self.tanks_history[tank_id].copy()
-            
-            # 按开始时间过滤
-            if start_time:
-                history = [h for h in history if h['timestamp'] >= start_time]
-            
-            # 按结束时间过滤
-            if end_time:
-                history = [h for h in history if h['timestamp'] <= end_time]
-            
-            # 限制返回的数据点数量
-            if limit and isinstance(limit, int) and limit > 0:
-                # 优先取最新的数据点
-                history = history[-limit:]
-            
-            return history
+            columns = self.tanks_history[tank_id].select(start_us, end_us, limit)
+        
+        return TankRing.columns_to_records(columns)
     
     def get_all_tanks_summary(self) -> Dict[str, Dict[str, Any]]:
         """获取所有罐的摘要信息
@@ -389,17 +830,17 @@ class DataManager:
             Dict[str, Dict[str, Any]]: 罐摘要信息字典
         """
         summary = {}
-        with self.data_lock:
-            for tank_id, tank_data in self.tanks_data.items():
-                summary[tank_id] = {
-                    'tank_id': tank_id,
-                    'status': tank_data.get('status', 'normal'),
-                    'temperature': tank_data.get('temperature'),
-                    'level': tank_data.get('level'),
-                    'pressure': tank_data.get('pressure'),
-                    'alert_message': tank_data.get('alert_message', ''),
-                    'last_updated': tank_data.get('timestamp')
-                }
+        # 读取只读快照，无需加锁
+        for tank_id, tank_data in self._tanks_view.items():
+            summary[tank_id] = {
+                'tank_id': tank_id,
+                'status': tank_data.get('status', 'normal'),
+                'temperature': tank_data.get('temperature'),
+                'level': tank_data.get('level'),
+                'pressure': tank_data.get('pressure'),
+                'alert_message': tank_data.get('alert_message', ''),
+                'last_updated': tank_data.get('timestamp')
+            }
         
         return summary
     
@@ -413,19 +854,19 @@ class DataManager:
         Returns:
             List[Dict[str, Any]]: 警报列表
         """
-        cutoff_time = (datetime.now() - timedelta(minutes=time_range)).isoformat()
+        cutoff_us = now_us() - time_range * US_PER_MINUTE
         
         with self.data_lock:
             filtered_alerts = []
             for alert in self.alerts:
                 # 按时间范围过滤
-                if alert['timestamp'] >= cutoff_time:
+                if alert['ts'] >= cutoff_us:
                     # 按罐ID过滤
                     if not tank_id or alert['tank_id'] == tank_id:
                         filtered_alerts.append(alert)
             
             # 按时间倒序排序
-            filtered_alerts.sort(key=lambda x: x['timestamp'], reverse=True)
+            filtered_alerts.sort(key=lambda x: x['ts'], reverse=True)
             
             return filtered_alerts
     
@@ -439,9 +880,19 @@ class DataManager:
         Returns:
             Dict[str, Any]: 统计信息
         """
-        history = self.get_tank_history(tank_id, time_range)
+        cutoff_us = now_us() - time_range * US_PER_MINUTE
         
-        if not history:
+        with self.data_lock:
+            history = self.tanks_history.get(tank_id)
+            if history is not None:
+                ts, temperatures, levels, _, status = history.columns()
+                start = np.searchsorted(ts, cutoff_us)
+                # 复制出时间范围内的数据，释放锁后再计算
+                temperatures = temperatures[start:].copy()
+                levels = levels[start:].copy()
+                status = status[start:].copy()
+        
+        if history is None or not len(status):
             return {
                 'tank_id': tank_id,
                 'data_points': 0,
@@ -454,22 +905,22 @@ class DataManager:
                 'alert_count': 0
             }
         
-        # 提取数据进行统计
-        temperatures = [h['temperature'] for h in history if h['temperature'] is not None]
-        levels = [h['level'] for h in history if h['level'] is not None]
-        alert_count = sum(1 for h in history if h['status'] in ['warning', 'alert'])
+        # 缺失值以NaN存储，只对有效值统计；状态编码非0即为warning或alert
+        avg_t, min_t, max_t, avg_l, min_l, max_l, alert_count = _history_stats(temperatures, levels, status)
+        has_temperature = not np.isnan(avg_t)
+        has_level = not np.isnan(avg_l)
         
         stats = {
             'tank_id': tank_id,
-            'data_points': len(history),
+            'data_points': len(status),
             'time_range': time_range,
-            'avg_temperature': round(np.mean(temperatures), 2) if temperatures else None,
-            'max_temperature': max(temperatures) if temperatures else None,
-            'min_temperature': min(temperatures) if temperatures else None,
-            'avg_level': round(np.mean(levels), 2) if levels else None,
-            'max_level': max(levels) if levels else None,
-            'min_level': min(levels) if levels else None,
-            'alert_count': alert_count
+            'avg_temperature': round(float(avg_t), 2) if has_temperature else None,
+            'max_temperature': float(max_t) if has_temperature else None,
+            'min_temperature': float(min_t) if has_temperature else None,
+            'avg_level': round(float(avg_l), 2) if has_level else None,
+            'max_level': float(max_l) if has_level else None,
+            'min_level': float(min_l) if has_level else None,
+            'alert_count': int(alert_count)
         }
         
         return stats
@@ -480,22 +931,22 @@ class DataManager:
         Returns:
             Dict[str, Any]: 整体状态信息
         """
+        # 获取最近的警报（get_alerts自行加锁）
+        recent_alerts = self.get_alerts(time_range=30)
+        
         with self.data_lock:
             total_tanks = len(self.tanks_data)
-            alert_tanks = sum(1 for tank in self.tanks_data.values() if tank['status'] == 'alert')
-            warning_tanks = sum(1 for tank in self.tanks_data.values() if tank['status'] == 'warning')
+            alert_tanks = self._status_counts['alert']
+            warning_tanks = self._status_counts['warning']
             normal_tanks = total_tanks - alert_tanks - warning_tanks
             
-            # 获取最近的警报
-            recent_alerts = self.get_alerts(time_range=30)
-            
             return {
                 'total_tanks': total_tanks,
                 'normal_tanks': normal_tanks,
                 'warning_tanks': warning_tanks,
                 'alert_tanks': alert_tanks,
                 'recent_alerts_count': len(recent_alerts),
-                'last_update_time': max(tank.get('timestamp', '') for tank in self.tanks_data.values()) if self.tanks_data else None
+                'last_update_time': self._last_update_time
             }
     
     def set_thresholds(self, 
@@ -527,9 +978,20 @@ class DataManager:
         if error is not None:
             self.error_threshold = error
         
-        # 重新检查所有罐的警报状态
-        for tank_id, tank_data in self.tanks_data.items():
-            self._check_alerts(tank_data)
+        # 在锁内重新检查所有罐的警报状态；已发布快照中的罐数据不可修改，逐个复制后替换
+        alerting = []
+        with self.data_lock:
+            for tank_id, tank_data in self.tanks_data.items():
+                updated = dict(tank_data)
+                if self._evaluate_alerts(updated):
+                    alerting.append(updated)
+                self.tanks_data[tank_id] = updated
+            self._recount_status()
+            self._publish_view()
+        
+        # add_alert自身需要获取data_lock，释放锁后再写入警报列表
+        for tank_data in alerting:
+            self.add_alert(tank_data)
         
         return {
             'temp_threshold_high': self.temp_threshold_high,
@@ -552,14 +1014,14 @@ class DataManager:
             with self.data_lock:
                 if tank_id:
                     if tank_id in self.tanks_history:
-                        self.tanks_history[tank_id] = []
+                        self.tanks_history[tank_id].clear()
                         logger.info(f"已清除罐 {tank_id} 的历史数据")
                 else:
                     self.tanks_history = {}
                     logger.info("已清除所有罐的历史数据")
                 
-            # 保存更改
-            self._save_history_data()
+            # 追加日志无法表达删除，需要重写快照
+            self._request_compaction()
             return True
         except Exception as e:
             logger.error(f"清除历史数据时出错: {str(e)}")
@@ -578,38 +1040,19 @@ class DataManager:
             with self.data_lock:
                 if tank_id in self.tanks_data:
                     del self.tanks_data[tank_id]
+                    self._recount_status()
+                    self._publish_view()
                 if tank_id in self.tanks_history:
                     del self.tanks_history[tank_id]
                 
-            # 保存更改
-            self._save_history_data()
+            # 追加日志无法表达删除，需要重写快照
+            self._request_compaction()
             logger.info(f"已移除罐 {tank_id} 的数据")
             return True
         except Exception as e:
             logger.error(f"移除罐数据时出错: {str(e)}")
             return False
     
-    def _start_cleanup_task(self) -> None:
-        """启动定期清理任务
-        
-        该方法创建一个守护线程，定期执行数据清理操作。清理任务每天运行一次，
-        移除超过配置存储天数的历史数据，确保系统资源得到有效利用。
-        守护线程会在主程序退出时自动终止，避免阻止程序正常退出。
-        """
-        def cleanup_task():
-            while True:
-                try:
-                    # 每天执行一次清理
-                    time.sleep(24 * 60 * 60)  # 24小时
-                    self._cleanup_expired_data()
-                except Exception as e:
-                    logger.error(f"执行定期清理任务时出错: {str(e)}")
-        
-        # 创建后台线程执行清理任务
-        cleanup_thread = threading.Thread(target=cleanup_task, daemon=True)
-        cleanup_thread.start()
-        logger.info("定期清理任务已启动")
-    
     def _cleanup_expired_data(self, tank_id: str = None) -> None:
         """清理过期的数据
         
@@ -619,14 +1062,14 @@ class DataManager:
         该方法通过以下步骤清理过期数据：
         1. 计算数据过期时间点（基于当前时间减去存储天数）
         2. 确定需要清理的罐列表
-        3. 对每个罐，过滤掉过期的历史数据记录
+        3. 对每个罐，二分查找过期位置并丢弃最旧的过期记录
         4. 记录清理操作的结果，包括删除的记录数量
         
         使用线程锁确保数据操作的原子性和线程安全。
         """
         try:
             # 计算过期时间点
-            cutoff_time = (datetime.now() - timedelta(days=self.storage_days)).isoformat()
+            cutoff_us = now_us() - self.storage_days * US_PER_DAY
             
             with self.data_lock:
                 # 确定要清理的罐
@@ -634,13 +1077,11 @@ class DataManager:
                 
                 for tid in tanks_to_clean:
                     if tid in self.tanks_history:
-                        # 过滤出未过期的数据
-                        filtered_history = [h for h in self.tanks_history[tid] if h['timestamp'] >= cutoff_time]
+                        # 二分查找过期位置，只丢弃最旧的过期记录
+                        removed_count = self.tanks_history[tid].drop_before(cutoff_us)
                         
                         # 如果删除了数据，记录日志
-                        if len(filtered_history) < len(self.tanks_history[tid]):
-                            removed_count = len(self.tanks_history[tid]) - len(filtered_history)
-                            self.tanks_history[tid] = filtered_history
+                        if removed_count:
                             logger.info(f"已清理罐 {tid} 的过期数据，共删除 {removed_count} 条记录")
         except Exception as e:
             logger.error(f"清理过期数据时出错: {str(e)}")
@@ -659,12 +1100,12 @@ class DataManager:
                 old_days = self.storage_days
                 self.storage_days = days
                 logger.info(f"数据存储天数已从 {old_days} 天修改为 {days} 天")
-                
-                # 立即清理过期数据
-                self._cleanup_expired_data()
-                
-                # 保存更改
-                self._save_history_data()
+            
+            # 立即清理过期数据（该方法自行加锁）
+            self._cleanup_expired_data()
+            
+            # 保存更改
+            self._request_compaction()
             return days
         else:
             logger.warning(f"无效的存储天数: {days}，必须大于0")
@@ -706,13 +1147,11 @@ class DataManager:
             self.max_history_points = points
             logger.info(f"每个罐的历史数据点数量已从 {old_points} 修改为 {points}")
             
-            # 清理所有罐的历史数据，确保不超过新的限制
-            for tank_id in self.tanks_history:
-                if len(self.tanks_history[tank_id]) > self.max_history_points:
-                    # 保留最新的数据点
-                    self.tanks_history[tank_id] = self.tanks_history[tank_id][-self.max_history_points:]
+            # 按新的限制重建历史数据缓冲区，超出部分只保留最新的数据点
+            for tank_id, history in self.tanks_history.items():
+                self.tanks_history[tank_id] = history.resized(points)
             
             # 保存更改
-            self._save_history_data()
+            self._request_compaction()
         
         return self.max_history_points
\ No newline at end of file
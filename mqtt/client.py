@@ -2,17 +2,131 @@
 # -*- coding: utf-8 -*-
 
 import paho.mqtt.client as mqtt_client
+import asyncio
+import functools
 import logging
-import os
-import json
-import time
+import orjson
+import random
 import ssl
 import threading
-from typing import Dict, List, Any, Optional, Callable
+import weakref
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple, Mapping
+
+# 可选的asyncio后端，未安装aiomqtt时只能使用paho线程循环
+try:
+    import aiomqtt
+except ImportError:
+    aiomqtt = None
+
+# paho-mqtt 2.x 提供新版回调API，1.x 回退到旧版构造方式
+try:
+    from paho.mqtt.enums import CallbackAPIVersion
+except ImportError:
+    CallbackAPIVersion = None
 
 # 配置日志
 logger = logging.getLogger('MQTTClient')
 
+
+class _RateLimitFilter(logging.Filter):
+    """相同日志模板在时间窗口内只输出前burst条，避免断线重连风暴时日志写入拖慢重连线程
+    
+    按record.msg（格式化前的模板）计数，DEBUG级别日志不受限制，ERROR及以上级别始终输出。
+    窗口结束后该模板再次出现时，会先输出一条被抑制日志数量的汇总。
+    """
+    
+    # 记录的模板数量超过该值时清理已过期的窗口
+    MAX_TRACKED = 256
+    
+    # 汇总日志携带的标记属性，汇总本身不参与限流
+    SUMMARY_ATTR = '_rate_limit_summary'
+    
+    def __init__(self, interval: float = 5.0, burst: int = 3):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._windows: Dict[Any, List] = {}  # 日志模板 -> [窗口开始时间, 窗口内次数]
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG or record.levelno >= logging.ERROR:
+            return True
+        if getattr(record, self.SUMMARY_ATTR, False):
+            return True
+        now = record.created
+        suppressed = 0
+        with self._lock:
+            window = self._windows.get(record.msg)
+            if window is not None and now - window[0] < self.interval:
+                window[1] += 1
+                return window[1] <= self.burst
+            if window is None:
+                if len(self._windows) >= self.MAX_TRACKED:
+                    cutoff = now - self.interval
+                    self._windows = {msg: w for msg, w in self._windows.items() if w[0] > cutoff}
+            else:
+                suppressed = window[1] - self.burst
+            self._windows[record.msg] = [now, 1]
+        # 在锁外输出汇总，汇总日志会再次经过本过滤器
+        if suppressed > 0:
+            logging.getLogger(record.name).log(
+                record.levelno, "上一个%.0f秒窗口内已抑制%d条相似日志: %s",
+                self.interval, suppressed, record.msg, extra={self.SUMMARY_ATTR: True}
+            )
+        return True
+
+
+logger.addFilter(_RateLimitFilter(5.0, 3))
+
+# 重连后批量重新订阅时，每个SUBSCRIBE报文包含的最大主题数量
+RESUBSCRIBE_BATCH_SIZE = 500
+
+# 具体主题到专用回调的解析结果缓存上限，超过后整体清空重建
+TOPIC_DISPATCH_CACHE_SIZE = 10000
+
+# 重连延迟随机抖动使用的随机数生成器，避免大量客户端同时重连
+_jitter_random = random.SystemRandom()
+
+# 连接/断开返回码对应的错误描述，所有实例共享
+_CONNECT_ERROR_MESSAGES: Mapping[int, str] = MappingProxyType({
+    0: "连接成功",
+    1: "连接被拒绝 - 协议版本不支持",
+    2: "连接被拒绝 - 客户端ID无效或已被占用",
+    3: "连接被拒绝 - 服务器不可用",
+    4: "连接被拒绝 - 用户名或密码错误",
+    5: "连接被拒绝 - 未授权",
+    6: "连接断开 - 服务端断开",
+    7: "连接被拒绝 - 未授权（返回码7）",
+    # 更多错误码
+    8: "连接被拒绝 - 服务器不可用（返回码8）",
+    9: "连接被拒绝 - 客户端已断开连接（返回码9）",
+    10: "连接被拒绝 - 连接超时（返回码10）"
+})
+
+# paho 2.x 将MQTT 3.1.1的CONNACK返回码转换为MQTT 5原因码，这里转换回3.1.1返回码，
+# 使错误描述和用户回调收到的rc与paho 1.x保持一致
+_V5_TO_V3_RC: Mapping[int, int] = MappingProxyType({
+    132: 1,  # Unsupported protocol version
+    133: 2,  # Client identifier not valid
+    136: 3,  # Server unavailable
+    134: 4,  # Bad user name or password
+    135: 5,  # Not authorized
+})
+
+def _invoke_safely(callback: Callable, label: str, *args: Any) -> None:
+    """调用用户回调并记录异常，避免异常传播到paho网络循环"""
+    try:
+        callback(*args)
+    except Exception as e:
+        logger.error("%s执行失败: %s", label, e)
+
+
+def _wrap_user_callback(callback: Optional[Callable], label: str) -> Optional[Callable]:
+    """为用户回调预先生成带异常保护的调用函数，回调无效时返回None"""
+    return functools.partial(_invoke_safely, callback, label) if callable(callback) else None
+
+
 class MQTTClient:
     """MQTT客户端类，用于处理MQTT连接、消息订阅和发布"""
     
@@ -32,7 +146,8 @@ class MQTTClient:
                  auto_reconnect: bool = True,
                  reconnect_delay: int = 2,
                  reconnect_delay_max: int = 30,
-                 reconnect_exponential_backoff: bool = True):
+                 reconnect_exponential_backoff: bool = True,
+                 use_asyncio: bool = False):
         # 使用传入的用户名和密码，不硬编码覆盖
         
         # 根据服务器特性和端口提供配置建议，但不强制覆盖用户设置
@@ -64,6 +179,7 @@ class MQTTClient:
             reconnect_delay: 初始重连延迟(秒)
             reconnect_delay_max: 最大重连延迟(秒)
             reconnect_exponential_backoff: 是否使用指数退避算法
+            use_asyncio: 是否使用aiomqtt异步后端，需要安装aiomqtt
         """
         # 配置参数
         self.broker_url = broker_url
@@ -77,6 +193,7 @@ class MQTTClient:
         self.tls_enabled = tls_enabled
         self.use_websockets = use_websockets
         self.websocket_path = websocket_path
+        self._transport = 'websockets' if use_websockets else 'tcp'
         
         # 重连参数
         self.auto_reconnect = auto_reconnect
@@ -86,7 +203,15 @@ class MQTTClient:
         self.current_reconnect_delay = reconnect_delay
         self.last_reconnect_attempt = 0
         
-        # 回调函数
+        # 异步后端：消息在事件循环中并发分发，不受paho单一回调线程限制
+        if use_asyncio and aiomqtt is None:
+            logger.error("未安装aiomqtt，无法使用asyncio后端，改用paho线程循环")
+        self.use_asyncio = use_asyncio and aiomqtt is not None
+        self._aio_client = None
+        self._aio_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._aio_task: Optional[asyncio.Task] = None
+        
+        # 回调函数（赋值时同时生成带异常保护的调用函数）
         self.on_message_callback = on_message_callback
         self.on_connect_callback = on_connect_callback
         self.on_disconnect_callback = on_disconnect_callback
@@ -94,57 +219,145 @@ class MQTTClient:
         # 状态变量
         self.client: Optional[mqtt_client.Client] = None
         self.is_connected = False
-        self.subscribed_topics: List[Dict[str, Any]] = []
+        self.subscribed_topics: Dict[str, Dict[str, Any]] = {}  # 主题 -> 订阅信息
+        # 具体主题 -> 匹配的专用回调元组，订阅变化时整体替换失效
+        self._topic_dispatch: Dict[str, Tuple[Callable, ...]] = {}
         self.loop_running = False
         self.loop_type = None  # 'thread', 'forever', or None
         self.loop_thread = None
         
-        # 初始化客户端
-        self._initialize_client()
+        # 等待服务器确认的QoS>0消息ID，全部确认后置位_confirms_done
+        self._pending_mids: set = set()
+        self._pending_lock = threading.RLock()
+        # 正在调用client.publish的发布方数量，以及期间先于登记到达的确认。
+        # 发布时不能持有_pending_lock（paho网络线程会持有_out_message_mutex回调_on_publish），
+        # 因此消息ID在publish返回后才登记，提前到达的确认暂存于此，发布方全部结束后清空
+        self._publishing = 0
+        self._early_acks: set = set()
+        self._confirms_done = threading.Event()
+        self._confirms_done.set()
+        # publish_async等待确认的消息ID -> (事件循环, Future)，同样由_pending_lock保护
+        self._mid_futures: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        # asyncio后端中由同步方法提交、尚未完成的QoS>0发布，同样由_pending_lock保护
+        self._aio_inflight: set = set()
+        
+        self._finalizer: Optional[weakref.finalize] = None
+        
+        # 初始化客户端（asyncio后端在start_loop中建立连接）
+        if not self.use_asyncio:
+            self._initialize_client()
+    
+    @property
+    def on_message_callback(self) -> Optional[Callable]:
+        """用户消息回调函数"""
+        return self._on_message_callback
+    
+    @on_message_callback.setter
+    def on_message_callback(self, callback: Optional[Callable]) -> None:
+        self._on_message_callback = callback
+        self._safe_on_message = _wrap_user_callback(callback, "用户消息回调函数")
+    
+    @property
+    def on_connect_callback(self) -> Optional[Callable]:
+        """用户连接回调函数"""
+        return self._on_connect_callback
+    
+    @on_connect_callback.setter
+    def on_connect_callback(self, callback: Optional[Callable]) -> None:
+        self._on_connect_callback = callback
+        self._safe_on_connect = _wrap_user_callback(callback, "用户连接回调函数")
+    
+    @property
+    def on_disconnect_callback(self) -> Optional[Callable]:
+        """用户断开连接回调函数"""
+        return self._on_disconnect_callback
+    
+    @on_disconnect_callback.setter
+    def on_disconnect_callback(self, callback: Optional[Callable]) -> None:
+        self._on_disconnect_callback = callback
+        self._safe_on_disconnect = _wrap_user_callback(callback, "用户断开连接回调函数")
     
     def _initialize_client(self) -> None:
         """初始化MQTT客户端实例，配置连接参数和回调函数"""
+        # 创建MQTT客户端，使用clean_session=True以简化连接，断线重连交给paho的网络循环处理
         try:
-            # 创建MQTT客户端，使用clean_session=True以简化连接
-            transport = 'websockets' if self.use_websockets else 'tcp'
-            self.client = mqtt_client.Client(client_id=self.client_id, clean_session=True, transport=transport)
-            
-            # 设置回调函数
-            self.client.on_connect = self._on_connect
-            self.client.on_disconnect = self._on_disconnect
-            self.client.on_message = self._on_message
-            
-            # 设置用户名和密码
-            if self.username is not None:
-                self.client.username_pw_set(self.username, self.password)
-                logger.info(f"已设置MQTT用户名: {self.username if self.username else '空'}")
-            
-            # 只有在auto_reconnect为True时才配置重连参数
-            if self.auto_reconnect:
-                logger.info(f"配置MQTT自动重连 - 最小延迟: {self.reconnect_delay}秒, 最大延迟: {self.reconnect_delay_max}秒")
-                self.client.reconnect_delay_set(
-                    min_delay=self.reconnect_delay,
-                    max_delay=self.reconnect_delay_max
-                )
+            if CallbackAPIVersion is not None:
+                client = mqtt_client.Client(CallbackAPIVersion.VERSION2, client_id=self.client_id, clean_session=True,
+                                            transport=self._transport, reconnect_on_failure=self.auto_reconnect)
             else:
-                logger.info("已禁用MQTT自动重连")
-            
-            # 如果启用了WebSocket，配置WebSocket连接
-            if self.use_websockets:
-                try:
-                    # 配置MQTT over WebSocket
-                    self.client.ws_set_options(path=self.websocket_path)
-                    logger.info(f"已配置MQTT over WebSocket，路径: {self.websocket_path}")
-                except Exception as e:
-                    logger.error(f"配置WebSocket时出错: {str(e)}")
-            
-            # 启用TLS
-            if self.tls_enabled:
-                self._configure_tls()
-                
-        except Exception as e:
-            logger.error(f"初始化MQTT客户端失败: {str(e)}")
-            logger.error(f"异常类型: {type(e).__name__}")
+                client = mqtt_client.Client(client_id=self.client_id, clean_session=True,
+                                            transport=self._transport, reconnect_on_failure=self.auto_reconnect)
+        except (ValueError, TypeError) as e:
+            logger.error("初始化MQTT客户端失败: %s", e)
+            logger.error("异常类型: %s", type(e).__name__)
+            return
+        self.client = client
+        
+        # 对象被回收或解释器退出时停止循环并断开连接，清理函数只引用paho客户端
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        self._finalizer = weakref.finalize(self, MQTTClient._safe_cleanup, client)
+        
+        # 设置回调函数（VERSION2签名经适配后交给统一的处理函数）
+        # 回调通过弱引用绑定，避免paho客户端反向持有本对象导致其无法被回收
+        if CallbackAPIVersion is not None:
+            client.on_connect = self._weak_callback(self._on_connect_v2)
+            client.on_disconnect = self._weak_callback(self._on_disconnect_v2)
+            client.on_publish = self._weak_callback(self._on_publish_v2)
+        else:
+            client.on_connect = self._weak_callback(self._on_connect)
+            client.on_disconnect = self._weak_callback(self._on_disconnect)
+            client.on_publish = self._weak_callback(self._on_publish)
+        client.on_message = self._weak_callback(self._on_message)
+        
+        # 设置用户名和密码
+        if self.username is not None:
+            client.username_pw_set(self.username, self.password)
+            logger.info("已设置MQTT用户名: %s", self.username or '空')
+        
+        # 只有在auto_reconnect为True时才配置重连参数
+        if self.auto_reconnect:
+            logger.info("配置MQTT自动重连 - 最小延迟: %s秒, 最大延迟: %s秒", self.reconnect_delay, self.reconnect_delay_max)
+            try:
+                client.reconnect_delay_set(min_delay=self.reconnect_delay, max_delay=self.reconnect_delay_max)
+            except ValueError as e:
+                logger.error("配置重连延迟时出错: %s", e)
+        else:
+            logger.info("已禁用MQTT自动重连")
+        
+        # 如果启用了WebSocket，配置WebSocket连接
+        if self.use_websockets:
+            try:
+                # 配置MQTT over WebSocket
+                client.ws_set_options(path=self.websocket_path)
+                logger.info("已配置MQTT over WebSocket，路径: %s", self.websocket_path)
+            except ValueError as e:
+                logger.error("配置WebSocket时出错: %s", e)
+        
+        # 启用TLS
+        if self.tls_enabled:
+            self._configure_tls()
+    
+    @staticmethod
+    def _weak_callback(method: Callable) -> Callable:
+        """将绑定方法包装为只持有弱引用的回调，对象被回收后回调不再执行"""
+        ref = weakref.WeakMethod(method)
+        
+        def callback(*args):
+            bound = ref()
+            if bound is not None:
+                bound(*args)
+        return callback
+    
+    @staticmethod
+    def _safe_cleanup(client: mqtt_client.Client) -> None:
+        """停止网络循环并断开连接，供weakref.finalize调用，不能引用MQTTClient实例"""
+        try:
+            client.loop_stop()
+            client.disconnect()
+        except Exception:
+            # 忽略清理过程中的异常
+            pass
     
     def _configure_tls(self) -> None:
         """配置TLS加密连接，增强安全性"""
@@ -155,41 +368,36 @@ class MQTTClient:
             self.client.tls_insecure_set(True)  # 允许自签名证书
             logger.info("已启用MQTT TLS加密，配置为忽略证书验证")
                 
-        except Exception as e:
+        except (ValueError, ssl.SSLError, OSError) as e:
             logger.error(f"设置TLS时出错: {str(e)}")
             logger.error(f"异常类型: {type(e).__name__}")
     
     def _on_connect(self, client: mqtt_client.Client, userdata: Any, flags: Dict[str, Any], rc: int) -> None:
         """MQTT连接回调函数，处理连接成功或失败的逻辑"""
         # 记录详细的连接信息
-        logger.debug(f"连接回调 - 返回码: {rc}, 标志: {flags}")
+        logger.debug("连接回调 - 返回码: %s, 标志: %s", rc, flags)
         
         if rc == 0:
             self.is_connected = True
             # 重置重连延迟
             self.current_reconnect_delay = self.reconnect_delay
-            logger.info(f"已成功连接到MQTT服务器: {self.broker_url}:{self.broker_port}")
+            if self.auto_reconnect:
+                client.reconnect_delay_set(min_delay=self.reconnect_delay, max_delay=self.reconnect_delay_max)
+            logger.info("已成功连接到MQTT服务器: %s:%s", self.broker_url, self.broker_port)
             
             # 重订阅之前的主题
             self._resubscribe_topics()
             
             # 调用用户定义的连接回调
-            if self.on_connect_callback:
-                try:
-                    self.on_connect_callback(client, userdata, flags, rc)
-                except Exception as e:
-                    logger.error(f"用户连接回调函数执行失败: {str(e)}")
+            if self._safe_on_connect:
+                self._safe_on_connect(client, userdata, flags, rc)
         else:
             self.is_connected = False
-            error_message = self._get_connect_error_message(rc)
-            logger.error(f"MQTT连接失败，返回码: {rc}, 错误: {error_message}")
+            logger.error("MQTT连接失败，返回码: %s, 错误: %s", rc, self._get_connect_error_message(rc))
             
             # 调用用户定义的连接回调
-            if self.on_connect_callback:
-                try:
-                    self.on_connect_callback(client, userdata, flags, rc)
-                except Exception as e:
-                    logger.error(f"用户连接回调函数执行失败: {str(e)}")
+            if self._safe_on_connect:
+                self._safe_on_connect(client, userdata, flags, rc)
     
     def _on_disconnect(self, client: mqtt_client.Client, userdata: Any, rc: int) -> None:
         """MQTT断开连接回调函数，处理正常和异常断开的情况"""
@@ -197,47 +405,163 @@ class MQTTClient:
         self.is_connected = False
         
         # 记录断开连接信息
-        logger.debug(f"断开连接回调 - 返回码: {rc}")
+        logger.debug("断开连接回调 - 返回码: %s", rc)
         
         # 如果不是正常断开连接（rc=0表示正常断开），记录警告
         if rc != 0:
-            error_message = self._get_connect_error_message(rc)
-            logger.warning(f"MQTT意外断开连接，返回码: {rc}, 错误: {error_message}")
-            logger.debug(f"断开连接时的客户端状态 - is_connected: {was_connected}, 客户端ID: {self.client_id}, 用户名: {self.username}")
+            logger.warning("MQTT意外断开连接，返回码: %s, 错误: %s", rc, self._get_connect_error_message(rc))
+            logger.debug("断开连接时的客户端状态 - is_connected: %s, 客户端ID: %s, 用户名: %s", was_connected, self.client_id, self.username)
+            
+            # 计算下一次重连延迟，并交给paho的自动重连使用
+            if self.auto_reconnect and self.client:
+                delay = self._compute_next_delay()
+                self.client.reconnect_delay_set(min_delay=delay, max_delay=max(delay, self.reconnect_delay_max))
+                logger.info("将在约%.1f秒后重连", delay)
         else:
             logger.info("MQTT连接已正常断开")
         
         # 调用用户定义的断开连接回调
-        if self.on_disconnect_callback:
-            try:
-                self.on_disconnect_callback(client, userdata, rc)
-            except Exception as e:
-                logger.error(f"用户断开连接回调函数执行失败: {str(e)}")
+        if self._safe_on_disconnect:
+            self._safe_on_disconnect(client, userdata, rc)
+    
+    @staticmethod
+    def _reason_code_to_rc(reason_code: Any) -> int:
+        """将paho 2.x的ReasonCode转换为整数返回码，成功时为0，CONNACK失败码转换为3.1.1返回码"""
+        if not reason_code.is_failure:
+            return 0
+        return _V5_TO_V3_RC.get(reason_code.value, reason_code.value)
+    
+    def _on_connect_v2(self, client: mqtt_client.Client, userdata: Any, flags: Any, reason_code: Any, properties: Any) -> None:
+        """paho 2.x 连接回调适配"""
+        self._on_connect(client, userdata, flags, self._reason_code_to_rc(reason_code))
+    
+    def _on_disconnect_v2(self, client: mqtt_client.Client, userdata: Any, disconnect_flags: Any, reason_code: Any, properties: Any) -> None:
+        """paho 2.x 断开连接回调适配"""
+        self._on_disconnect(client, userdata, self._reason_code_to_rc(reason_code))
+    
+    def _on_publish_v2(self, client: mqtt_client.Client, userdata: Any, mid: int, reason_code: Any, properties: Any) -> None:
+        """paho 2.x 发布确认回调适配"""
+        self._on_publish(client, userdata, mid)
     
     def _on_message(self, client: mqtt_client.Client, userdata: Any, msg: mqtt_client.MQTTMessage) -> None:
         """MQTT消息接收回调函数，增强消息处理能力"""
-        try:
-            # 尝试解析JSON消息
-            payload = msg.payload.decode('utf-8')
-            
-            # 尝试解析JSON格式的消息
-            try:
-                data = json.loads(payload)
-                logger.debug(f"收到JSON消息 - 主题: {msg.topic}, QoS: {msg.qos}, 负载: {payload[:100]}...")
-            except json.JSONDecodeError:
-                # 如果不是JSON格式，保持原始负载
-                data = payload
-                logger.debug(f"收到非JSON消息 - 主题: {msg.topic}, QoS: {msg.qos}, 负载: {data[:100]}...")
-            
-            # 调用用户定义的消息回调
-            if self.on_message_callback:
+        # 按具体主题缓存匹配结果，每条消息只需一次字典查找即可分发到专用回调
+        handlers = self._topic_dispatch.get(msg.topic)
+        if handlers is None:
+            handlers = self._resolve_topic_handlers(msg.topic)
+        if handlers:
+            for handler in handlers:
+                handler(client, userdata, msg.topic, msg)
+            return
+        
+        # 解析结果只用于调试日志，未启用DEBUG时跳过解码和解析
+        if logger.isEnabledFor(logging.DEBUG):
+            raw = msg.payload
+            # 先检查首字节，只有对象/数组形式的负载才尝试解析，非JSON消息不进入异常路径
+            is_json = raw[:1] in (b'{', b'[')
+            if is_json:
                 try:
-                    self.on_message_callback(client, userdata, msg)
-                except Exception as e:
-                    logger.error(f"用户消息回调函数执行失败: {str(e)}")
-        except Exception as e:
-            logger.error(f"处理MQTT消息时出错: {str(e)}")
-            logger.error(f"异常类型: {type(e).__name__}")
+                    # orjson可直接解析字节串，无需先解码
+                    orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    is_json = False
+            if is_json:
+                logger.debug("收到JSON消息 - 主题: %s, QoS: %s, 负载: %s...", msg.topic, msg.qos, raw[:100].decode('utf-8', 'replace'))
+            else:
+                # 如果不是JSON格式，记录原始负载
+                logger.debug("收到非JSON消息 - 主题: %s, QoS: %s, 负载: %s...", msg.topic, msg.qos, raw[:100].decode('utf-8', 'replace'))
+        
+        # 调用用户定义的消息回调（异常保护在设置回调时已包装好）
+        safe_on_message = self._safe_on_message
+        if safe_on_message:
+            safe_on_message(client, userdata, msg)
+    
+    def _resolve_topic_handlers(self, topic: str) -> Tuple[Callable, ...]:
+        """找出与具体主题匹配的所有专用回调并写入缓存
+        
+        只在缓存未命中时遍历订阅过滤器，之后同一主题的消息分发开销与订阅数量无关。
+        
+        Args:
+            topic: 消息的具体主题
+        
+        Returns:
+            Tuple[Callable, ...]: 匹配的专用回调，没有时为空元组
+        """
+        # 先取得当前缓存，订阅在解析期间变化时结果只会写入已失效的旧缓存
+        dispatch = self._topic_dispatch
+        handlers = tuple(info['handler'] for info in list(self.subscribed_topics.values())
+                         if info.get('handler') and mqtt_client.topic_matches_sub(info['topic'], topic))
+        if len(dispatch) >= TOPIC_DISPATCH_CACHE_SIZE:
+            dispatch.clear()
+        dispatch[topic] = handlers
+        return handlers
+    
+    def _compute_next_delay(self) -> float:
+        """计算下一次重连延迟
+        
+        启用指数退避时延迟按2倍增长直至最大延迟，否则保持初始延迟；
+        在此基础上加入0到初始延迟之间的随机抖动，避免服务器重启后所有客户端同时重连。
+        
+        Returns:
+            float: 本次重连延迟（秒）
+        """
+        delay = self.current_reconnect_delay
+        if self.reconnect_exponential_backoff:
+            self.current_reconnect_delay = min(self.reconnect_delay_max, self.current_reconnect_delay * 2)
+        return delay + _jitter_random.uniform(0, self.reconnect_delay)
+    
+    def _on_publish(self, client: mqtt_client.Client, userdata: Any, mid: int) -> None:
+        """MQTT发布确认回调函数，QoS>0的消息收到服务器确认后从待确认集合中移除"""
+        with self._pending_lock:
+            waiter = self._mid_futures.pop(mid, None)
+            if mid in self._pending_mids:
+                self._pending_mids.discard(mid)
+                if not self._pending_mids:
+                    self._confirms_done.set()
+            elif waiter is None and self._publishing:
+                # 确认先于登记到达，由登记方处理
+                self._early_acks.add(mid)
+        
+        # 在网络线程中收到确认，通知对应事件循环中的Future
+        if waiter:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._resolve_future, future)
+    
+    def _begin_publish(self) -> None:
+        """标记开始调用client.publish，期间记录先于登记到达的确认"""
+        with self._pending_lock:
+            self._publishing += 1
+    
+    def _end_publish(self) -> None:
+        """标记client.publish调用及消息ID登记结束，没有发布方时清空暂存的确认"""
+        with self._pending_lock:
+            self._publishing -= 1
+            if not self._publishing:
+                self._early_acks.clear()
+    
+    def _register_mid(self, mid: int, waiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = None) -> bool:
+        """登记等待确认的消息ID，确认已提前到达时返回False
+        
+        Args:
+            mid: 消息ID
+            waiter: publish_async的(事件循环, Future)，为None时登记到待确认集合
+        """
+        with self._pending_lock:
+            if mid in self._early_acks:
+                self._early_acks.discard(mid)
+                return False
+            if waiter is not None:
+                self._mid_futures[mid] = waiter
+            else:
+                self._pending_mids.add(mid)
+                self._confirms_done.clear()
+            return True
+    
+    @staticmethod
+    def _resolve_future(future: asyncio.Future) -> None:
+        """设置发布确认结果，等待方已取消时忽略"""
+        if not future.done():
+            future.set_result(True)
     
     def _resubscribe_topics(self) -> None:
         """重新订阅之前的主题，确保连接恢复后能够继续接收消息"""
@@ -245,33 +569,25 @@ class MQTTClient:
             logger.warning("未连接，无法重新订阅主题")
             return
         
-        for topic_info in self.subscribed_topics:
+        # 使用多主题订阅，每批主题只发送一个SUBSCRIBE报文
+        topics = [(info['topic'], info['qos']) for info in self.subscribed_topics.values()]
+        for start in range(0, len(topics), RESUBSCRIBE_BATCH_SIZE):
+            batch = topics[start:start + RESUBSCRIBE_BATCH_SIZE]
             try:
-                result, mid = self.client.subscribe(topic_info['topic'], qos=topic_info['qos'])
+                result, mid = self.client.subscribe(batch)
                 if result == mqtt_client.MQTT_ERR_SUCCESS:
-                    logger.info(f"已重新订阅主题: {topic_info['topic']}, QoS: {topic_info['qos']}")
+                    for topic, _ in batch:
+                        self.subscribed_topics[topic]['mid'] = mid
+                    logger.info(f"已重新订阅 {len(batch)} 个主题")
                 else:
-                    logger.error(f"重新订阅主题 {topic_info['topic']} 失败，返回码: {result}")
+                    logger.error(f"重新订阅 {len(batch)} 个主题失败，返回码: {result}")
             except Exception as e:
-                logger.error(f"重新订阅主题 {topic_info['topic']} 时出错: {str(e)}")
+                logger.error(f"重新订阅 {len(batch)} 个主题时出错: {str(e)}")
     
-    def _get_connect_error_message(self, rc: int) -> str:
+    @staticmethod
+    def _get_connect_error_message(rc: int) -> str:
         """根据返回码获取连接错误消息，提供更详细的错误描述"""
-        error_messages = {
-            0: "连接成功",
-            1: "连接被拒绝 - 协议版本不支持",
-            2: "连接被拒绝 - 客户端ID无效或已被占用",
-            3: "连接被拒绝 - 服务器不可用",
-            4: "连接被拒绝 - 用户名或密码错误",
-            5: "连接被拒绝 - 未授权",
-            6: "连接断开 - 服务端断开",
-            7: "连接被拒绝 - 未授权（返回码7）",
-            # 更多错误码
-            8: "连接被拒绝 - 服务器不可用（返回码8）",
-            9: "连接被拒绝 - 客户端已断开连接（返回码9）",
-            10: "连接被拒绝 - 连接超时（返回码10）"
-        }
-        return error_messages.get(rc, f"未知错误 (返回码: {rc})")
+        return _CONNECT_ERROR_MESSAGES.get(rc, f"未知错误 (返回码: {rc})")
     
     def connect(self) -> bool:
         """连接到MQTT服务器，增强连接稳定性
@@ -283,6 +599,10 @@ class MQTTClient:
             logger.warning("已经连接到MQTT服务器")
             return True
         
+        if self.use_asyncio:
+            logger.info("asyncio后端将在start_loop启动后连接MQTT服务器")
+            return True
+        
         try:
             if self.client:
                 # 验证连接参数
@@ -291,72 +611,61 @@ class MQTTClient:
                     return False
                 
                 if not isinstance(self.broker_port, int) or self.broker_port <= 0 or self.broker_port > 65535:
-                    logger.error(f"无效的MQTT服务器端口: {self.broker_port}")
+                    logger.error("无效的MQTT服务器端口: %s", self.broker_port)
                     return False
                 
-                # 详细的连接参数日志
-                logger.info(f"============== MQTT连接参数详情 ==============")
-                logger.info(f"服务器URL: {self.broker_url}")
-                logger.info(f"服务器端口: {self.broker_port}")
-                logger.info(f"客户端ID: {self.client_id}")
-                logger.info(f"用户名: {'已设置' if self.username is not None else '未设置'} (值: {self.username})")
-                logger.info(f"密码: {'已设置' if self.password is not None else '未设置'} (长度: {len(self.password) if self.password is not None else 0})")
-                logger.info(f"TLS启用: {self.tls_enabled}")
-                logger.info(f"WebSocket启用: {self.use_websockets}")
-                logger.info(f"WebSocket路径: {self.websocket_path}")
-                logger.info(f"保活时间: {self.keepalive}秒")
-                logger.info(f"自动重连: {self.auto_reconnect}")
-                logger.info(f"============================================")
+                # 连接参数详情只在DEBUG级别输出
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("MQTT连接参数详情: %s", {
+                        'broker_url': self.broker_url,
+                        'broker_port': self.broker_port,
+                        'client_id': self.client_id,
+                        'username': self.username,
+                        'password_set': self.password is not None,
+                        'tls_enabled': self.tls_enabled,
+                        'use_websockets': self.use_websockets,
+                        'websocket_path': self.websocket_path,
+                        'keepalive': self.keepalive,
+                        'auto_reconnect': self.auto_reconnect
+                    })
                 
                 # 检查服务器类型和端口匹配，并提供警告，但不强制覆盖用户设置
                 if self.broker_url.endswith('emqxsl.cn') and not self.tls_enabled:
                     logger.warning("警告: 检测到EMQ SSL服务器，但TLS未启用，这可能导致连接失败或不安全")
                 
                 if self.broker_port == 8084 and not self.use_websockets:
-                    logger.warning(f"警告: 端口{self.broker_port}通常用于WebSocket连接，但WebSocket未启用，这可能导致连接失败")
+                    logger.warning("警告: 端口%s通常用于WebSocket连接，但WebSocket未启用，这可能导致连接失败", self.broker_port)
                 elif self.broker_port == 8883 and not self.tls_enabled:
-                    logger.warning(f"警告: 端口{self.broker_port}通常用于TLS加密连接，但TLS未启用，这可能导致连接失败")
+                    logger.warning("警告: 端口%s通常用于TLS加密连接，但TLS未启用，这可能导致连接失败", self.broker_port)
+                
+                logger.info("正在连接MQTT服务器 %s:%s（%s, TLS: %s, 客户端ID: %s）",
+                            self.broker_url, self.broker_port,
+                            'WebSocket' if self.use_websockets else 'TCP', self.tls_enabled, self.client_id)
                 
                 # 根据连接类型选择合适的连接方法
                 if self.use_websockets:
-                    logger.info("使用WebSocket连接模式")
                     try:
-                        # 记录连接尝试的详细信息
-                        logger.info(f"[连接尝试] 服务器: {self.broker_url}, 端口: {self.broker_port}, WebSocket路径: {self.websocket_path}")
-                        logger.info(f"[连接尝试] TLS: {self.tls_enabled}")
-                        logger.info(f"[连接尝试] 客户端ID: {self.client_id}")
-                        if self.username is not None:
-                            logger.info(f"[连接尝试] 使用用户名: {self.username}")
-                        
                         # WebSocket连接使用异步连接方式
                         self.client.connect_async(self.broker_url, self.broker_port, self.keepalive)
-                        logger.info("WebSocket连接命令已发送")
+                        logger.debug("WebSocket连接命令已发送，路径: %s", self.websocket_path)
                         
                         # 立即启动客户端循环
                         self.start_loop(loop_type='thread')
                     except Exception as ws_error:
-                        logger.error(f"WebSocket连接异常: {str(ws_error)}")
-                        logger.error(f"异常类型: {type(ws_error).__name__}")
+                        logger.error("WebSocket连接异常: %s", ws_error)
+                        logger.error("异常类型: %s", type(ws_error).__name__)
                         raise
                 else:
-                    logger.info("使用TCP连接模式")
                     try:
-                        # 记录连接尝试的详细信息
-                        logger.info(f"[连接尝试] 服务器: {self.broker_url}, 端口: {self.broker_port}")
-                        logger.info(f"[连接尝试] TLS: {self.tls_enabled}")
-                        logger.info(f"[连接尝试] 客户端ID: {self.client_id}")
-                        if self.username is not None:
-                            logger.info(f"[连接尝试] 使用用户名: {self.username}")
-                        
                         # 常规TCP连接使用同步连接
                         self.client.connect(self.broker_url, self.broker_port, self.keepalive)
-                        logger.info("TCP连接命令已发送")
+                        logger.debug("TCP连接命令已发送")
                         
                         # 立即启动客户端循环
                         self.start_loop(loop_type='thread')
                     except Exception as tcp_error:
-                        logger.error(f"TCP连接异常: {str(tcp_error)}")
-                        logger.error(f"异常类型: {type(tcp_error).__name__}")
+                        logger.error("TCP连接异常: %s", tcp_error)
+                        logger.error("异常类型: %s", type(tcp_error).__name__)
                         raise
                 
                 return True
@@ -372,6 +681,10 @@ class MQTTClient:
     
     def disconnect(self) -> None:
         """断开与MQTT服务器的连接，确保资源正确释放"""
+        if self.use_asyncio:
+            self._cancel_aio_task()
+            return
+        
         if self.client:
             try:
                 if self.is_connected:
@@ -385,12 +698,20 @@ class MQTTClient:
         else:
             logger.warning("MQTT客户端未初始化")
     
-    def subscribe(self, topic: str, qos: int = 1) -> bool:
+    def subscribe(self, topic: str, qos: int = 1, payload_type: str = 'auto', callback: Optional[Callable] = None) -> bool:
         """订阅MQTT主题，确保主题持久性
         
+        指定callback时会为该主题注册专用回调，匹配该主题的消息
+        直接分发到专用回调，不再经过通用的负载探测和消息回调：
+        - payload_type='json': callback(client, userdata, topic, 解析后的数据)
+        - payload_type='bytes': callback(client, userdata, topic, 原始字节负载)
+        - payload_type='auto': callback(client, userdata, msg)
+        
         Args:
             topic: 要订阅的主题
             qos: 服务质量等级
+            payload_type: 负载类型，可选 'json'、'bytes'、'auto'
+            callback: 该主题专用的消息回调函数，为None时使用通用消息回调
         
         Returns:
             bool: 订阅是否成功
@@ -399,6 +720,13 @@ class MQTTClient:
             logger.error("订阅主题不能为空")
             return False
         
+        if payload_type not in ('json', 'bytes', 'auto'):
+            logger.error(f"不支持的负载类型: {payload_type}")
+            return False
+        
+        if self.use_asyncio:
+            return self._subscribe_aio(topic, qos, payload_type, callback)
+        
         if not self.client or not self.is_connected:
             logger.warning("无法订阅主题，MQTT未连接")
             return False
@@ -406,20 +734,11 @@ class MQTTClient:
         try:
             result, mid = self.client.subscribe(topic, qos=qos)
             if result == mqtt_client.MQTT_ERR_SUCCESS:
-                # 保存订阅的主题信息，用于重连后自动重新订阅
-                topic_exists = False
-                for i, t in enumerate(self.subscribed_topics):
-                    if t['topic'] == topic:
-                        self.subscribed_topics[i] = {'topic': topic, 'qos': qos, 'mid': mid}
-                        topic_exists = True
-                        break
+                handler = self._build_topic_handler(topic, payload_type, callback) if callback else None
                 
-                if not topic_exists:
-                    self.subscribed_topics.append({
-                        'topic': topic,
-                        'qos': qos,
-                        'mid': mid
-                    })
+                # 保存订阅的主题信息，用于重连后自动重新订阅（重复订阅时覆盖）
+                self.subscribed_topics[topic] = {'topic': topic, 'qos': qos, 'mid': mid, 'handler': handler}
+                self._topic_dispatch = {}
                 
                 logger.info(f"已订阅主题: {topic}, QoS: {qos}")
                 return True
@@ -430,6 +749,85 @@ class MQTTClient:
             logger.error(f"订阅主题 {topic} 时出错: {str(e)}")
             return False
     
+    def _subscribe_aio(self, topic: str, qos: int, payload_type: str, callback: Optional[Callable]) -> bool:
+        """asyncio后端的订阅：记录主题，已连接时在事件循环中立即订阅，否则在连接后统一订阅"""
+        handler = self._build_topic_handler(topic, payload_type, callback) if callback else None
+        self.subscribed_topics[topic] = {'topic': topic, 'qos': qos, 'mid': None, 'handler': handler}
+        self._topic_dispatch = {}
+        if self.is_connected and self._aio_client is not None:
+            self._submit_aio(self._aio_client.subscribe(topic, qos=qos), f"订阅主题 {topic}")
+        logger.info(f"已订阅主题: {topic}, QoS: {qos}")
+        return True
+    
+    def _submit_aio(self, coro: Any, label: str, track: bool = False) -> bool:
+        """将协程提交到asyncio后端的事件循环执行，执行失败时记录错误日志
+        
+        可在任意线程中调用，不等待执行结果。
+        
+        Args:
+            coro: 要执行的协程
+            label: 日志中描述该操作的文字
+            track: 是否计入wait_for_confirms等待的发布
+        
+        Returns:
+            bool: 是否已提交到事件循环
+        """
+        try:
+            future = asyncio.run_coroutine_threadsafe(coro, self._aio_loop)
+        except RuntimeError as e:
+            coro.close()
+            logger.error("%s失败，事件循环不可用: %s", label, e)
+            return False
+        if track:
+            with self._pending_lock:
+                self._aio_inflight.add(future)
+                self._confirms_done.clear()
+        future.add_done_callback(functools.partial(self._on_aio_done, label, track))
+        return True
+    
+    def _on_aio_done(self, label: str, track: bool, future: Any) -> None:
+        """_submit_aio提交的协程完成回调：记录失败，并更新待确认的发布"""
+        if track:
+            with self._pending_lock:
+                self._aio_inflight.discard(future)
+                if not self._aio_inflight and not self._pending_mids:
+                    self._confirms_done.set()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("%s失败: %s", label, future.exception())
+    
+    @staticmethod
+    def _build_topic_handler(topic: str, payload_type: str, callback: Callable) -> Callable:
+        """根据负载类型生成主题专用的消息回调，避免逐条消息探测负载格式
+        
+        Args:
+            topic: 订阅的主题
+            payload_type: 负载类型
+            callback: 用户回调函数
+        
+        Returns:
+            Callable: 签名为(client, userdata, 主题字符串, msg)的回调函数
+        """
+        # paho在回调抛出异常时会终止网络循环，因此专用回调仍需捕获异常
+        if payload_type == 'json':
+            def handler(client, userdata, msg_topic, msg):
+                try:
+                    callback(client, userdata, msg_topic, orjson.loads(msg.payload))
+                except Exception as e:
+                    logger.error("主题 %s 的消息回调执行失败: %s", topic, e)
+        elif payload_type == 'bytes':
+            def handler(client, userdata, msg_topic, msg):
+                try:
+                    callback(client, userdata, msg_topic, msg.payload)
+                except Exception as e:
+                    logger.error("主题 %s 的消息回调执行失败: %s", topic, e)
+        else:
+            def handler(client, userdata, msg_topic, msg):
+                try:
+                    callback(client, userdata, msg)
+                except Exception as e:
+                    logger.error("主题 %s 的消息回调执行失败: %s", topic, e)
+        return handler
+    
     def unsubscribe(self, topic: str) -> bool:
         """取消订阅MQTT主题
         
@@ -443,17 +841,26 @@ class MQTTClient:
             logger.error("取消订阅的主题不能为空")
             return False
         
+        if self.use_asyncio:
+            # 已连接时在事件循环中发送UNSUBSCRIBE，未连接时重连后不会再订阅该主题
+            self._forget_topic(topic)
+            if self.is_connected and self._aio_client is not None:
+                if not self._submit_aio(self._aio_client.unsubscribe(topic), f"取消订阅主题 {topic}"):
+                    return False
+            logger.info(f"已取消订阅主题: {topic}")
+            return True
+        
         if not self.client or not self.is_connected:
             logger.warning("无法取消订阅主题，MQTT未连接")
             # 仍然从已订阅列表中删除主题
-            self.subscribed_topics = [t for t in self.subscribed_topics if t['topic'] != topic]
+            self._forget_topic(topic)
             return True
         
         try:
             result, mid = self.client.unsubscribe(topic)
             if result == mqtt_client.MQTT_ERR_SUCCESS:
                 # 从订阅列表中移除
-                self.subscribed_topics = [t for t in self.subscribed_topics if t['topic'] != topic]
+                self._forget_topic(topic)
                 logger.info(f"已取消订阅主题: {topic}")
                 return True
             else:
@@ -463,9 +870,18 @@ class MQTTClient:
             logger.error(f"取消订阅主题 {topic} 时出错: {str(e)}")
             return False
     
-    def publish(self, topic: str, payload: Any, qos: int = 1, retain: bool = False) -> bool:
+    def _forget_topic(self, topic: str) -> None:
+        """从订阅列表中移除主题，并注销其专用消息回调"""
+        info = self.subscribed_topics.pop(topic, None)
+        if info and info.get('handler'):
+            self._topic_dispatch = {}
+    
+    def publish(self, topic: str, payload: Any, qos: int = 1, retain: bool = False) -> Tuple[bool, Optional[mqtt_client.MQTTMessageInfo]]:
         """发布MQTT消息，增强消息格式处理
         
+        发布不等待服务器确认，需要确认时可使用返回的MQTTMessageInfo
+        （如wait_for_publish、is_published）或改用publish_async。
+        
         Args:
             topic: 发布的主题
             payload: 消息负载
@@ -473,47 +889,207 @@ class MQTTClient:
             retain: 是否保留消息
         
         Returns:
-            bool: 发布是否成功
+            Tuple[bool, Optional[MQTTMessageInfo]]: 发布是否成功，以及paho返回的消息信息（失败时为None）。
+            asyncio后端中表示是否已提交到事件循环，消息信息始终为None，发送失败记录在日志中
         """
         if not topic:
             logger.error("发布主题不能为空")
-            return False
+            return False, None
+        
+        if self.use_asyncio:
+            if self._aio_client is None or not self.is_connected:
+                logger.warning("无法发布消息，MQTT未连接")
+                return False, None
+            try:
+                payload = self._encode_payload(payload)
+            except Exception as e:
+                logger.error(f"无法序列化payload为JSON: {str(e)}")
+                return False, None
+            coro = self._aio_client.publish(topic, payload, qos=qos, retain=retain)
+            return self._submit_aio(coro, f"发布消息到主题 {topic}", track=qos > 0), None
         
         if not self.client or not self.is_connected:
             logger.warning("无法发布消息，MQTT未连接")
-            return False
+            return False, None
         
         try:
-            # 确保payload是字符串或可序列化对象
-            if isinstance(payload, dict):
-                try:
-                    payload = json.dumps(payload)
-                except Exception as e:
-                    logger.error(f"无法序列化payload为JSON: {str(e)}")
-                    return False
-            elif not isinstance(payload, (str, bytes)):
-                payload = str(payload)
+            # 确保payload是字符串、字节串或可序列化对象
+            try:
+                payload = self._encode_payload(payload)
+            except Exception as e:
+                logger.error(f"无法序列化payload为JSON: {str(e)}")
+                return False, None
             
-            result, mid = self.client.publish(topic, payload, qos=qos, retain=retain)
-            if result == mqtt_client.MQTT_ERR_SUCCESS:
-                logger.info(f"已发布消息 - 主题: {topic}, QoS: {qos}, 保留: {retain}, 负载: {payload[:100]}...")
-                return True
+            info = self.client.publish(topic, payload, qos=qos, retain=retain)
+            if info.rc == mqtt_client.MQTT_ERR_SUCCESS:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("已发布消息 - 主题: %s, QoS: %s, 保留: %s, 负载: %s...", topic, qos, retain, payload[:100])
+                return True, info
             else:
-                logger.error(f"发布消息到主题 {topic} 失败，返回码: {result}")
-                return False
+                logger.error(f"发布消息到主题 {topic} 失败，返回码: {info.rc}")
+                return False, None
+        except Exception as e:
+            logger.error(f"发布消息到主题 {topic} 时出错: {str(e)}")
+            return False, None
+    
+    async def publish_async(self, topic: str, payload: Any, qos: int = 1, retain: bool = False) -> bool:
+        """发布MQTT消息并异步等待服务器确认，不阻塞事件循环
+        
+        Args:
+            topic: 发布的主题
+            payload: 消息负载
+            qos: 服务质量等级，为0时发送后立即返回
+            retain: 是否保留消息
+        
+        Returns:
+            bool: 发布是否成功（QoS>0时表示已收到服务器确认）
+        """
+        if self.use_asyncio:
+            return await self._publish_aio(topic, payload, qos, retain)
+        
+        loop = asyncio.get_running_loop()
+        # 不持有_pending_lock发布，避免与paho网络线程的确认回调死锁；
+        # 确认先于Future登记到达时直接返回成功
+        self._begin_publish()
+        try:
+            ok, info = self.publish(topic, payload, qos=qos, retain=retain)
+            if not ok or qos == 0:
+                return ok
+            future = loop.create_future()
+            if not self._register_mid(info.mid, (loop, future)):
+                return True
+        finally:
+            self._end_publish()
+        
+        try:
+            return await future
+        finally:
+            with self._pending_lock:
+                self._mid_futures.pop(info.mid, None)
+    
+    async def _publish_aio(self, topic: str, payload: Any, qos: int, retain: bool) -> bool:
+        """通过aiomqtt发布消息，QoS>0时等待服务器确认后返回"""
+        if not topic:
+            logger.error("发布主题不能为空")
+            return False
+        if self._aio_client is None or not self.is_connected:
+            logger.warning("无法发布消息，MQTT未连接")
+            return False
+        try:
+            await self._aio_client.publish(topic, self._encode_payload(payload), qos=qos, retain=retain)
+            return True
         except Exception as e:
             logger.error(f"发布消息到主题 {topic} 时出错: {str(e)}")
             return False
     
+    def publish_batch(self, messages: Iterable[Tuple[str, Any, int, bool]]) -> int:
+        """批量发布MQTT消息，不逐条等待服务器确认
+        
+        所有负载先统一序列化，再连续调用publish；QoS>0的消息ID记录在待确认集合中，
+        由发布确认回调异步移除，需要时可调用wait_for_confirms等待全部确认。
+        
+        Args:
+            messages: (主题, 负载, QoS, 是否保留) 序列
+        
+        Returns:
+            int: 成功发送的消息数量（asyncio后端中为已提交到事件循环的消息数量）
+        """
+        if self.use_asyncio:
+            connected = self._aio_client is not None and self.is_connected
+        else:
+            connected = self.client is not None and self.is_connected
+        if not connected:
+            logger.warning("无法发布消息，MQTT未连接")
+            return 0
+        
+        # 先校验并序列化所有消息，避免在发送循环中处理
+        prepared = []
+        for topic, payload, qos, retain in messages:
+            if not topic:
+                logger.error("发布主题不能为空，已跳过该消息")
+                continue
+            try:
+                prepared.append((topic, self._encode_payload(payload), qos, retain))
+            except Exception as e:
+                logger.error(f"无法序列化发往主题 {topic} 的payload: {str(e)}")
+        
+        if self.use_asyncio:
+            return self._publish_batch_aio(prepared)
+        
+        sent = 0
+        publish = self.client.publish
+        # 不持有_pending_lock调用publish，避免与paho网络线程的确认回调死锁；
+        # 确认先于登记到达时由_register_mid识别
+        self._begin_publish()
+        try:
+            for topic, payload, qos, retain in prepared:
+                try:
+                    result, mid = publish(topic, payload, qos=qos, retain=retain)
+                except Exception as e:
+                    logger.error(f"发布消息到主题 {topic} 时出错: {str(e)}")
+                    continue
+                if result == mqtt_client.MQTT_ERR_SUCCESS:
+                    sent += 1
+                    if qos > 0:
+                        self._register_mid(mid)
+                else:
+                    logger.error(f"发布消息到主题 {topic} 失败，返回码: {result}")
+        finally:
+            self._end_publish()
+        
+        logger.info(f"已批量发布消息 {sent}/{len(prepared)} 条")
+        return sent
+    
+    def _publish_batch_aio(self, prepared: List[Tuple[str, Any, int, bool]]) -> int:
+        """asyncio后端的批量发布：在事件循环中依次发布，发布出错时停止发送剩余消息"""
+        client = self._aio_client
+        
+        async def publish_all():
+            for topic, payload, qos, retain in prepared:
+                await client.publish(topic, payload, qos=qos, retain=retain)
+        
+        track = any(qos > 0 for _, _, qos, _ in prepared)
+        if not prepared or not self._submit_aio(publish_all(), f"批量发布 {len(prepared)} 条消息", track=track):
+            return 0
+        logger.info(f"已提交批量发布消息 {len(prepared)} 条")
+        return len(prepared)
+    
+    def wait_for_confirms(self, timeout: Optional[float] = None) -> bool:
+        """等待所有已发布的QoS>0消息收到服务器确认
+        
+        Args:
+            timeout: 超时时间（秒），None表示一直等待
+        
+        Returns:
+            bool: 是否在超时前全部确认
+        """
+        return self._confirms_done.wait(timeout)
+    
+    @staticmethod
+    def _encode_payload(payload: Any) -> Any:
+        """将负载转换为paho可发送的类型：字典序列化为JSON字节串，其他非字符串对象转换为字符串"""
+        payload_type = type(payload)
+        if payload_type is bytes or payload_type is str:
+            return payload
+        if isinstance(payload, dict):
+            return orjson.dumps(payload)
+        if isinstance(payload, (str, bytes)):
+            return payload
+        return str(payload)
+    
     def start_loop(self, loop_type: str = 'thread') -> bool:
         """启动MQTT客户端循环，增强循环管理
         
         Args:
-            loop_type: 循环类型，可选值: 'thread'(线程模式), 'forever'(阻塞模式)
+            loop_type: 循环类型，可选值: 'thread'(线程模式), 'forever'(阻塞模式)；
+                asyncio后端忽略该参数，需在运行中的事件循环内调用
         
         Returns:
             bool: 启动是否成功
         """
+        if self.use_asyncio:
+            return self._start_aio_loop()
+        
         if not self.client:
             logger.error("MQTT客户端未初始化")
             return False
@@ -554,12 +1130,114 @@ class MQTTClient:
             self.loop_type = None
             return False
     
+    def _start_aio_loop(self) -> bool:
+        """在当前事件循环中创建asyncio后端的连接与消息分发任务"""
+        if self.loop_running:
+            logger.warning("循环已经在运行")
+            return True
+        try:
+            self._aio_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.error("asyncio后端需要在运行中的事件循环内启动")
+            return False
+        self._aio_task = self._aio_loop.create_task(self._run_aio())
+        self.loop_running = True
+        self.loop_type = 'asyncio'
+        logger.info("已启动MQTT asyncio循环")
+        return True
+    
+    def _cancel_aio_task(self) -> None:
+        """取消asyncio后端任务，任务退出时会断开连接"""
+        task = self._aio_task
+        if task is not None and not task.done():
+            self._aio_loop.call_soon_threadsafe(task.cancel)
+        self._aio_task = None
+        self.loop_running = False
+        self.loop_type = None
+    
+    async def _run_aio(self) -> None:
+        """asyncio后端主循环：连接、订阅已记录的主题，并为每条消息创建分发任务，断线时按退避延迟重连"""
+        tls_params = aiomqtt.TLSParameters() if self.tls_enabled else None
+        while True:
+            try:
+                async with aiomqtt.Client(hostname=self.broker_url, port=self.broker_port,
+                                          username=self.username, password=self.password,
+                                          identifier=self.client_id, keepalive=self.keepalive,
+                                          transport=self._transport,
+                                          websocket_path=self.websocket_path if self.use_websockets else None,
+                                          tls_params=tls_params, tls_insecure=True if self.tls_enabled else None) as client:
+                    self._aio_client = client
+                    self.is_connected = True
+                    self.current_reconnect_delay = self.reconnect_delay
+                    logger.info("已成功连接到MQTT服务器: %s:%s", self.broker_url, self.broker_port)
+                    
+                    for info in list(self.subscribed_topics.values()):
+                        await client.subscribe(info['topic'], qos=info['qos'])
+                    if self._safe_on_connect:
+                        self._safe_on_connect(client, None, {}, 0)
+                    
+                    # 消息处理与网络读取并发进行，慢回调不会阻塞后续消息的接收；
+                    # 不使用TaskGroup，断线时的MqttError直接抛出而不会被包装成ExceptionGroup
+                    pending = set()
+                    try:
+                        async for msg in client.messages:
+                            task = asyncio.ensure_future(self._dispatch_aio(client, msg))
+                            pending.add(task)
+                            task.add_done_callback(pending.discard)
+                    finally:
+                        for task in pending:
+                            task.cancel()
+            except aiomqtt.MqttError as e:
+                self.is_connected = False
+                self._aio_client = None
+                logger.warning("MQTT意外断开连接: %s", e)
+                if self._safe_on_disconnect:
+                    self._safe_on_disconnect(None, None, 1)
+                if not self.auto_reconnect:
+                    break
+                delay = self._compute_next_delay()
+                logger.info("将在约%.1f秒后重连", delay)
+                await asyncio.sleep(delay)
+            finally:
+                self.is_connected = False
+                self._aio_client = None
+    
+    async def _dispatch_aio(self, client: Any, msg: Any) -> None:
+        """分发aiomqtt消息：专用主题回调优先，其次为用户消息回调（支持协程函数）
+        
+        专用回调收到的主题与paho后端一致，为字符串而不是aiomqtt的Topic对象。
+        """
+        topic = msg.topic.value
+        handlers = self._topic_dispatch.get(topic)
+        if handlers is None:
+            handlers = self._resolve_topic_handlers(topic)
+        if handlers:
+            for handler in handlers:
+                handler(client, None, topic, msg)
+            return
+        
+        callback = self._on_message_callback
+        if callback is None:
+            return
+        if asyncio.iscoroutinefunction(callback):
+            try:
+                await callback(client, None, msg)
+            except Exception as e:
+                logger.error("用户消息回调函数执行失败: %s", e)
+        else:
+            self._safe_on_message(client, None, msg)
+    
     def stop_loop(self) -> bool:
         """停止MQTT客户端循环，确保资源正确释放
         
         Returns:
             bool: 停止是否成功
         """
+        if self.use_asyncio:
+            self._cancel_aio_task()
+            logger.info("已停止MQTT asyncio循环")
+            return True
+        
         if not self.client:
             logger.error("MQTT客户端未初始化")
             return False
@@ -589,11 +1267,12 @@ class MQTTClient:
             'broker_url': self.broker_url,
             'broker_port': self.broker_port,
             'client_id': self.client_id,
-            'subscribed_topics': [t['topic'] for t in self.subscribed_topics],
+            'subscribed_topics': list(self.subscribed_topics.keys()),
             'tls_enabled': self.tls_enabled,
             'use_websockets': self.use_websockets,
             'loop_running': self.loop_running,
             'loop_type': self.loop_type,
+            'use_asyncio': self.use_asyncio,
             'auto_reconnect': self.auto_reconnect,
             'current_reconnect_delay': self.current_reconnect_delay
         }
@@ -634,21 +1313,6 @@ class MQTTClient:
         else:
             logger.error("无效的回调函数")
     
-    def __del__(self):
-        """析构函数，确保断开连接和停止循环，防止资源泄漏"""
-        try:
-            # 确保停止循环
-            if hasattr(self, 'loop_running') and self.loop_running:
-                self.stop_loop()
-            
-            # 确保断开连接
-            if hasattr(self, 'is_connected') and self.is_connected:
-                self.disconnect()
-            
-        except Exception:
-            # 忽略析构函数中的异常
-            pass
-    
     def reset_reconnect_delay(self) -> None:
         """重置重连延迟，通常在成功连接后调用
         """
@@ -11,6 +11,5 @@ webbrowser.open(url)
 print(f"浏览器已尝试打开，访问地址: {url}")
 print("如果浏览器未自动打开，请手动在浏览器中输入上述地址")
 
-# 等待用户看到提示
-print("\n按回车键退出...")
-input()
\ No newline at end of file
+# 稍作等待，让浏览器进程完成启动后再退出
+time.sleep(0.5)
\ No newline at end of file
@@ -3,25 +3,23 @@
 
 import os
 import sys
-import webbrowser
-import argparse
 import logging
-from threading import Timer
-from typing import Optional
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
+from types import SimpleNamespace
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
 logger = logging.getLogger('run_app')
 
+# 脚本所在目录，模块加载时计算一次
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
 # 添加当前目录到Python路径
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _HERE)
+
+# 已解析的命令行参数，parse_arguments首次调用后缓存
+_ARGS: Optional['argparse.Namespace'] = None
 
 """MQTT Web界面启动脚本
 
@@ -35,17 +33,25 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 避免在代码中硬编码这些信息。
 """
 
-def create_env_file(env_path: str) -> None:
-    """创建.env环境文件（如果不存在）
+def _configure_logging(env: str) -> None:
+    """配置日志输出到控制台，开发环境同时写入app.log
     
-    该函数创建一个模板.env文件，包含所有必要的配置参数，但不包含实际的敏感信息。
-    用户需要手动编辑此文件以提供MQTT连接凭据等敏感信息。
+    在解析命令行参数之后调用，--help或参数错误时不会创建日志文件。
     
     Args:
-        env_path: .env文件路径
+        env: 运行环境 (development/production)
     """
-    if not os.path.exists(env_path):
-        default_env_content = '''
+    handlers = [logging.StreamHandler()]
+    if env == 'development':
+        handlers.insert(0, logging.FileHandler('app.log'))
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+# .env模板内容（UTF-8编码字节），模块加载时生成一次
+_DEFAULT_ENV_BYTES = """
 # Web服务器配置
 FLASK_APP=app.py
 FLASK_ENV=development
@@ -75,31 +81,48 @@ DATA_DIR=data
 HISTORY_FILE=tank_history.json
 MAX_HISTORY_POINTS=1000
 
+# SocketIO配置 (eventlet/gevent/threading)
+SOCKETIO_ASYNC_MODE=eventlet
+
 # 日志配置
 LOG_LEVEL=INFO
 
 # 环境选择 (development/production)
 CONFIG_NAME=development
-'''.strip()
-        
-        try:
-            with open(env_path, 'w', encoding='utf-8') as f:
-                f.write(default_env_content)
-            logger.info(f"已创建.env文件: {env_path}")
-        except Exception as e:
-            logger.error(f"创建.env文件时出错: {str(e)}")
+""".strip().encode('utf-8')
+
+def create_env_file(env_path: str) -> None:
+    """创建.env环境文件（如果不存在）
+    
+    该函数创建一个模板.env文件，包含所有必要的配置参数，但不包含实际的敏感信息。
+    用户需要手动编辑此文件以提供MQTT连接凭据等敏感信息。
+    
+    Args:
+        env_path: .env文件路径
+    """
+    try:
+        # 以独占模式创建，文件已存在时直接返回，无需额外的存在性检查
+        with open(env_path, 'xb') as f:
+            f.write(_DEFAULT_ENV_BYTES)
+        logger.info(f"已创建.env文件: {env_path}")
+    except FileExistsError:
+        pass
+    except Exception as e:
+        logger.error(f"创建.env文件时出错: {str(e)}")
 
 def open_browser(url: str, delay: int = 2) -> None:
-    """延迟打开浏览器
+    """服务器就绪后打开浏览器
     
-    该函数在指定的延迟时间后打开Web浏览器访问指定的URL。
-    主要用于在应用启动后自动打开用户界面，提升用户体验。
+    该函数在后台守护线程中等待服务器端口可以连接，然后打开Web浏览器访问指定的URL，
+    避免浏览器在服务器完成端口绑定之前访问。主要用于在应用启动后自动打开用户界面，提升用户体验。
     
     Args:
         url: 要打开的URL地址
-        delay: 延迟秒数，默认值为2（秒）
+        delay: 等待服务器就绪的最长秒数，超时后仍会尝试打开，默认值为2（秒）；为0时立即打开
     """
     def _open():
+        # 仅在需要打开浏览器时才导入webbrowser，避免启动时探测浏览器
+        import webbrowser
         try:
             webbrowser.open(url)
             logger.info(f"已打开浏览器访问: {url}")
@@ -107,9 +130,26 @@ def open_browser(url: str, delay: int = 2) -> None:
             logger.warning(f"无法打开浏览器: {str(e)}")
             logger.info(f"请手动访问以下地址: {url}")
     
+    def _open_when_ready():
+        import socket
+        import time
+        from urllib.parse import urlsplit
+        
+        parts = urlsplit(url)
+        address = (parts.hostname, parts.port or 80)
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(address, timeout=0.5).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        _open()
+    
     if delay > 0:
-        logger.info(f"{delay}秒后打开浏览器...")
-        Timer(delay, _open).start()
+        logger.info(f"服务器就绪后打开浏览器（最长等待{delay}秒）...")
+        import threading
+        threading.Thread(target=_open_when_ready, name='open-browser', daemon=True).start()
     else:
         _open()
 
@@ -128,7 +168,7 @@ def install_dependencies() -> bool:
     logger.info("建议安装的依赖: Flask, paho-mqtt")
     return True
 
-def run_app(args: argparse.Namespace) -> None:
+def run_app(args: 'argparse.Namespace') -> None:
     """运行Flask应用
     
     该函数是应用程序的核心启动函数，负责：
@@ -140,12 +180,8 @@ def run_app(args: argparse.Namespace) -> None:
         args: 解析后的命令行参数
     """
     try:
-        # 尊重已有的环境变量设置，仅在未设置时使用命令行参数
-        if 'CONFIG_NAME' not in os.environ:
-            os.environ['CONFIG_NAME'] = args.env
-        
-        # 记录当前运行环境
-        config_name = os.environ.get('CONFIG_NAME', 'development')
+        # 尊重已有的环境变量设置，仅在未设置时使用命令行参数，并记录当前运行环境
+        config_name = os.environ.setdefault('CONFIG_NAME', args.env)
         logger.info(f"应用运行配置: {config_name}")
         
         # 如果设置了固定的MQTT客户端ID，记录信息
@@ -153,20 +189,21 @@ def run_app(args: argparse.Namespace) -> None:
             logger.info(f"使用固定MQTT客户端ID: {os.environ['MQTT_FIXED_CLIENT_ID']}")
         
         # 导入Flask应用（延迟导入以提高启动速度）
-        from app import app
+        from app import app, socketio
         
         # 构建URL
         url = f"http://{args.host}:{args.port}"
         
         # 如果是开发环境且配置了自动打开浏览器，则打开浏览器
-        if args.env == 'development' and args.open_browser:
-            open_browser(url, delay=2)
+        # 开发环境的重载器会在子进程中再次执行本脚本，只在主进程中打开一次
+        if args.env == 'development' and args.open_browser and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+            open_browser(url, delay=10)
         
         logger.info(f"正在启动Web应用 - 访问地址: {url}")
         logger.info("按Ctrl+C停止服务器")
         
-        # 运行Flask应用
-        app.run(host=args.host, port=args.port, debug=(args.env == 'development'))
+        # 通过SocketIO运行Flask应用，使用配置的异步模式（eventlet/gevent）提供WebSocket服务
+        socketio.run(app, host=args.host, port=args.port, debug=(args.env == 'development'))
         
     except ImportError as e:
         logger.error(f"导入模块时出错: {str(e)}")
@@ -176,7 +213,7 @@ def run_app(args: argparse.Namespace) -> None:
         logger.error(f"启动应用时出错: {str(e)}")
         sys.exit(1)
 
-def parse_arguments() -> argparse.Namespace:
+def parse_arguments() -> 'argparse.Namespace':
     """解析命令行参数
     
     该函数设置并解析应用程序的命令行参数，包括运行环境、服务器配置和浏览器行为。
@@ -184,6 +221,17 @@ def parse_arguments() -> argparse.Namespace:
     Returns:
         argparse.Namespace: 包含所有解析后命令行参数的命名空间对象
     """
+    global _ARGS
+    if _ARGS is not None:
+        return _ARGS
+    
+    # 没有命令行参数时直接返回默认值，无需导入和构建argparse解析器
+    if len(sys.argv) == 1:
+        _ARGS = SimpleNamespace(env=os.environ.get('CONFIG_NAME', 'development'), host='127.0.0.1',
+                                port=5000, open_browser=True, install_deps=False)
+        return _ARGS
+    
+    import argparse
     parser = argparse.ArgumentParser(description='启动MQTT Web监控界面')
     
     # 环境配置
@@ -207,7 +255,8 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument('--install-deps', action='store_true', default=False,
                         help='安装项目依赖（已废弃） (默认: False)')
     
-    return parser.parse_args()
+    _ARGS = parser.parse_args()
+    return _ARGS
 
 def main() -> None:
     """应用程序主入口函数
@@ -221,12 +270,13 @@ def main() -> None:
     # 解析命令行参数
     args = parse_arguments()
     
-    # 获取当前目录
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+    # 参数解析成功后再配置日志
+    _configure_logging(args.env)
     
-    # 创建.env文件（如果不存在）
-    env_path = os.path.join(current_dir, '.env')
-    create_env_file(env_path)
+    # 创建.env文件（如果不存在）；开发环境重载器的子进程启动时父进程已处理过
+    if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        env_path = os.path.join(_HERE, '.env')
+        create_env_file(env_path)
     
     # 安装依赖（如果需要）
     if args.install_deps:
@@ -13,6 +13,7 @@ let alarmModal = null;
 let lastUpdateTime = new Date();
 let processedTanks = new Set(); // 用于跟踪已处理的罐
 let tankColors = []; // 存储每个罐的颜色
+let tanksState = {}; // 当前所有罐的完整数据，用于合并增量更新
 
 // DOM加载完成后执行
 $(document).ready(function() {
@@ -107,9 +108,19 @@ function initSocket() {
         updateMQTTStatus(data.connected, data.message);
     });
     
-    // 罐数据更新事件
+    // 罐数据更新事件（完整快照）
     socket.on('tank_data_update', function(data) {
-        updateTankData(data);
+        tanksState = parseTankSnapshot(data);
+        updateTankData(tanksState);
+        updateLastUpdateTime();
+    });
+    
+    // 罐数据增量更新事件，只包含发生变化的罐
+    socket.on('tank_data_delta', function(data) {
+        $.each(data, function(tankId, tank) {
+            tanksState[tankId] = tank;
+        });
+        updateTankData(tanksState);
         updateLastUpdateTime();
     });
     
@@ -134,6 +145,14 @@ function initSocket() {
     });
 }
 
+// 解析罐数据快照，服务器可能以预先序列化的二进制JSON发送
+function parseTankSnapshot(data) {
+    if (data instanceof ArrayBuffer) {
+        return JSON.parse(new TextDecoder('utf-8').decode(data));
+    }
+    return data;
+}
+
 // 定期从API获取数据（当Socket.IO被禁用时使用）
 function fetchDataPeriodically() {
     $.ajax({
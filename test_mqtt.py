@@ -3,9 +3,10 @@
 
 import os
 import sys
-import json
-import time
+import orjson
 import random
+import socket
+import threading
 import paho.mqtt.client as mqtt
 
 # 添加当前目录到Python路径
@@ -21,8 +22,34 @@ MQTT_TLS_ENABLED = os.environ.get('MQTT_TLS_ENABLED', 'True').lower() == 'true'
 # MQTT主题
 MQTT_TOPIC_TANK_DATA = os.environ.get('MQTT_TOPIC_TANK_DATA', 'tanks/data')
 
-# 创建MQTT客户端
-client = mqtt.Client(client_id=f"test_publisher_{int(time.time())}")
+# 每轮连续发布的消息数量，压测时可调大
+TEST_PUBLISH_BATCH = int(os.environ.get('TEST_PUBLISH_BATCH', '1'))
+if TEST_PUBLISH_BATCH < 1:
+    sys.exit(f"TEST_PUBLISH_BATCH必须大于等于1，当前值: {TEST_PUBLISH_BATCH}")
+
+# 测试数据模板：11个罐的固定字段只构建一次，只读。每次发布复制后填入随机字段，
+# 因为paho后台线程（on_connect）和主线程都会调用publish_test_data
+_TANKS_TEMPLATE = [
+    {
+        'id': i,
+        'name': f'{i}#沥青罐',
+        'temperature': 0.0,
+        'level': 0.0,
+        'weight': 0.0,
+        'height': 8.0,  # 罐高8米
+        'high_limit': 6.4,  # 高限6.4米
+        'alarm_shown': False,
+        'error': 0.0
+    }
+    for i in range(1, 12)
+]
+_random = random.Random()
+
+# 创建MQTT客户端，客户端ID包含进程号和随机后缀，避免并行运行时ID冲突导致互相踢下线
+client = mqtt.Client(client_id=f"test_publisher_{os.getpid()}_{_random.getrandbits(32):08x}")
+
+# 限制断线重连的等待时间
+client.reconnect_delay_set(min_delay=1, max_delay=5)
 
 # 设置用户名和密码
 if MQTT_USERNAME:
@@ -37,6 +64,11 @@ if MQTT_TLS_ENABLED:
 def on_connect(client, userdata, flags, rc):
     if rc == 0:
         print(f"成功连接到MQTT服务器: {MQTT_BROKER_URL}:{MQTT_BROKER_PORT}")
+        # 关闭Nagle算法并增大发送缓冲区，小报文立即发出
+        sock = client.socket()
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
         # 连接成功后立即发布一次测试数据
         publish_test_data()
     else:
@@ -44,36 +76,32 @@ def on_connect(client, userdata, flags, rc):
 
 # 发布测试数据
 def publish_test_data():
-    # 创建测试数据
-    tanks_data = {
-        'tanks': []
-    }
-    
-    for i in range(1, 12):  # 创建11个罐的数据
-        # 生成随机但合理的罐数据
-        tank = {
-            'id': i,
-            'name': f'{i}#沥青罐',
-            'temperature': round(random.uniform(140.0, 160.0), 1),  # 温度在140-160℃之间
-            'level': round(random.uniform(2.0, 6.0), 3),  # 液位在2-6米之间
-            'weight': round(random.uniform(10.0, 50.0), 3),  # 重量在10-50吨之间
-            'height': 8.0,  # 罐高8米
-            'high_limit': 6.4,  # 高限6.4米
-            'alarm_shown': False,
-            'error': 0.0
+    # 生成随机但合理的罐数据，在模板副本上填入随机字段
+    uniform = _random.uniform
+    tanks = [
+        {
+            **tank,
+            'temperature': round(uniform(140.0, 160.0), 1),  # 温度在140-160℃之间
+            'level': round(uniform(2.0, 6.0), 3),  # 液位在2-6米之间
+            'weight': round(uniform(10.0, 50.0), 3)  # 重量在10-50吨之间
         }
-        tanks_data['tanks'].append(tank)
+        for tank in _TANKS_TEMPLATE
+    ]
     
-    # 将数据转换为JSON字符串
-    payload = json.dumps(tanks_data, ensure_ascii=False)
+    # 将数据转换为JSON字节串
+    payload = orjson.dumps({'tanks': tanks})
     
-    # 发布数据
-    result = client.publish(MQTT_TOPIC_TANK_DATA, payload, qos=1)
+    # 发布数据：QoS 0无需等待PUBACK，同一字节串连续发布TEST_PUBLISH_BATCH次
+    publish = client.publish
+    for _ in range(TEST_PUBLISH_BATCH):
+        result = publish(MQTT_TOPIC_TANK_DATA, payload, qos=0)
+        if result.rc != mqtt.MQTT_ERR_SUCCESS:
+            break
     
     # 检查发布是否成功
     if result.rc == mqtt.MQTT_ERR_SUCCESS:
-        print(f"成功发布测试数据到主题: {MQTT_TOPIC_TANK_DATA}")
-        print(f"发布的数据: {payload}")
+        print(f"成功发布 {TEST_PUBLISH_BATCH} 条测试数据到主题: {MQTT_TOPIC_TANK_DATA}")
+        print(f"发布的数据: {payload.decode('utf-8')}")
     else:
         print(f"发布测试数据失败，错误码: {result.rc}")
 
@@ -87,10 +115,14 @@ client.connect(MQTT_BROKER_URL, MQTT_BROKER_PORT, 60)
 # 启动MQTT循环
 client.loop_start()
 
+# 停止信号，等待期间由paho后台线程处理网络收发
+stop_event = threading.Event()
+
 try:
     # 每5秒发布一次数据，共发布3次
     for i in range(3):
-        time.sleep(5)
+        if stop_event.wait(5):
+            break
         publish_test_data()
     
     print("测试数据发布完成")
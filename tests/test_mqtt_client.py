@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mqtt import client as mqtt_client_module
+from mqtt.client import MQTTClient
+
+
+class FakeMqttError(Exception):
+    pass
+
+
+class FakeTopic:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeMessage:
+    def __init__(self, topic, payload, qos=0):
+        self.topic = FakeTopic(topic)
+        self.payload = payload
+        self.qos = qos
+
+
+class FakeAioClient:
+    """模拟aiomqtt.Client：每次连接按脚本依次产出消息或抛出异常，脚本结束后保持连接"""
+    scripts = []
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.subscribed = []
+        self.unsubscribed = []
+        self.published = []
+        self.script = FakeAioClient.scripts.pop(0)
+        FakeAioClient.instances.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def subscribe(self, topic, qos=0):
+        if topic.startswith('denied/'):
+            raise FakeMqttError('subscribe refused')
+        self.subscribed.append((topic, qos))
+
+    async def unsubscribe(self, topic):
+        self.unsubscribed.append(topic)
+
+    async def publish(self, topic, payload, qos=0, retain=False):
+        self.published.append((topic, payload, qos))
+
+    @property
+    def messages(self):
+        return self._iter_messages()
+
+    async def _iter_messages(self):
+        for item in self.script:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await asyncio.Event().wait()
+
+
+fake_aiomqtt = types.SimpleNamespace(Client=FakeAioClient, MqttError=FakeMqttError, TLSParameters=object)
+
+
+class AsyncioBackendTest(unittest.TestCase):
+    def setUp(self):
+        FakeAioClient.scripts = []
+        FakeAioClient.instances = []
+        patcher = mock.patch.object(mqtt_client_module, 'aiomqtt', fake_aiomqtt)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reconnects_after_broker_disconnect_and_passes_str_topic(self):
+        FakeAioClient.scripts = [
+            [FakeMqttError('connection lost')],
+            [FakeMessage('tanks/1', b'{"temperature": 150}')],
+        ]
+        received = []
+        disconnects = []
+        client = MQTTClient('localhost', 1883, use_asyncio=True, reconnect_delay=0.01, reconnect_delay_max=0.02,
+                            on_disconnect_callback=lambda c, u, rc: disconnects.append(rc))
+        self.assertTrue(client.subscribe('tanks/+', qos=1, payload_type='json',
+                                         callback=lambda c, u, topic, data: received.append((topic, data))))
+
+        async def run():
+            self.assertTrue(client.start_loop())
+            for _ in range(100):
+                if received:
+                    break
+                await asyncio.sleep(0.01)
+            task = client._aio_task
+            client.stop_loop()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        self.assertEqual(disconnects, [1])
+        self.assertEqual(len(FakeAioClient.instances), 2)
+        self.assertEqual(FakeAioClient.instances[1].subscribed, [('tanks/+', 1)])
+        self.assertEqual(received, [('tanks/1', {'temperature': 150})])
+        self.assertIs(type(received[0][0]), str)
+        self.assertFalse(client.is_connected)
+
+    def test_sync_api_is_routed_through_event_loop(self):
+        FakeAioClient.scripts = [[]]
+        client = MQTTClient('localhost', 1883, use_asyncio=True)
+
+        def call_from_other_thread(func, *args):
+            result = []
+            worker = threading.Thread(target=lambda: result.append(func(*args)))
+            worker.start()
+            worker.join()
+            return result[0]
+
+        async def run():
+            self.assertTrue(client.start_loop())
+            while not client.is_connected:
+                await asyncio.sleep(0.01)
+            ok, info = call_from_other_thread(client.publish, 'tanks/1', {'level': 1.5}, 1)
+            self.assertTrue(ok)
+            self.assertIsNone(info)
+            self.assertEqual(call_from_other_thread(client.publish_batch, [('tanks/2', b'a', 1, False), ('tanks/3', 'b', 0, False)]), 2)
+            self.assertTrue(call_from_other_thread(client.subscribe, 'tanks/4', 1))
+            self.assertTrue(call_from_other_thread(client.unsubscribe, 'tanks/4'))
+            with self.assertLogs('MQTTClient', level='ERROR') as captured:
+                call_from_other_thread(client.subscribe, 'denied/1', 1)
+                for _ in range(100):
+                    if captured.output:
+                        break
+                    await asyncio.sleep(0.01)
+            self.assertIn('订阅主题 denied/1失败', captured.output[0])
+            self.assertTrue(await asyncio.to_thread(client.wait_for_confirms, 1))
+            task = client._aio_task
+            client.stop_loop()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        fake = FakeAioClient.instances[0]
+        self.assertEqual(fake.published, [('tanks/1', b'{"level":1.5}', 1), ('tanks/2', b'a', 1), ('tanks/3', 'b', 0)])
+        self.assertEqual(fake.subscribed, [('tanks/4', 1)])
+        self.assertEqual(fake.unsubscribed, ['tanks/4'])
+        self.assertNotIn('tanks/4', client.subscribed_topics)
+
+
+class TopicHandlerTest(unittest.TestCase):
+    def test_paho_dispatch_passes_str_topic(self):
+        received = []
+        client = MQTTClient('localhost', 1883)
+        handler = client._build_topic_handler('tanks/+', 'bytes', lambda c, u, topic, payload: received.append((topic, payload)))
+        client.subscribed_topics['tanks/+'] = {'topic': 'tanks/+', 'qos': 1, 'mid': 1, 'handler': handler}
+        msg = mqtt_client_module.mqtt_client.MQTTMessage(topic=b'tanks/2')
+        msg.payload = b'raw'
+        client._on_message(client.client, None, msg)
+        self.assertEqual(received, [('tanks/2', b'raw')])
+
+
+class AckBeforeRegisterClient:
+    """模拟paho客户端：publish在返回前由另一个线程（网络线程）回调发布确认"""
+
+    def __init__(self, on_publish):
+        self.on_publish = on_publish
+        self.mid = 0
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        self.mid += 1
+        acker = threading.Thread(target=self.on_publish, args=(self, None, self.mid))
+        acker.start()
+        acker.join(timeout=1)
+        if acker.is_alive():
+            raise AssertionError("确认回调被发布方阻塞")
+        info = mqtt_client_module.mqtt_client.MQTTMessageInfo(self.mid)
+        info.rc = mqtt_client_module.mqtt_client.MQTT_ERR_SUCCESS
+        return info
+
+
+class PublishConfirmTest(unittest.TestCase):
+    def setUp(self):
+        self.client = MQTTClient('localhost', 1883)
+        self.client.client = AckBeforeRegisterClient(self.client._on_publish)
+        self.client.is_connected = True
+
+    def test_publish_batch_does_not_block_ack_and_keeps_early_ack(self):
+        sent = self.client.publish_batch([('tanks/1', b'a', 1, False), ('tanks/2', b'b', 1, False)])
+        self.assertEqual(sent, 2)
+        self.assertTrue(self.client.wait_for_confirms(timeout=1))
+        self.assertEqual(self.client._early_acks, set())
+
+    def test_publish_async_resolves_when_ack_arrives_before_register(self):
+        async def run():
+            return await asyncio.wait_for(self.client.publish_async('tanks/1', b'a', qos=1), timeout=1)
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertEqual(self.client._mid_futures, {})
+
+
+class EncodePayloadTest(unittest.TestCase):
+    def test_equal_but_distinct_values_are_encoded_exactly(self):
+        self.assertEqual(MQTTClient._encode_payload({'a': -0.0}), b'{"a":-0.0}')
+        self.assertEqual(MQTTClient._encode_payload({'a': 0.0}), b'{"a":0.0}')
+
+
+class ReasonCodeTest(unittest.TestCase):
+    def test_v5_connack_codes_map_back_to_v3(self):
+        def reason_code(value):
+            return types.SimpleNamespace(value=value, is_failure=value >= 128)
+
+        to_rc = MQTTClient._reason_code_to_rc
+        self.assertEqual(to_rc(reason_code(0)), 0)
+        self.assertEqual(to_rc(reason_code(134)), 4)
+        self.assertEqual(to_rc(reason_code(135)), 5)
+        self.assertEqual(to_rc(reason_code(128)), 128)
+        self.assertEqual(MQTTClient._get_connect_error_message(to_rc(reason_code(134))), "连接被拒绝 - 用户名或密码错误")
+
+
+class RateLimitFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.logger = mqtt_client_module.logging.getLogger('MQTTClient.test_rate_limit')
+        self.rate_filter = mqtt_client_module._RateLimitFilter(interval=60.0, burst=3)
+        self.logger.addFilter(self.rate_filter)
+        self.addCleanup(self.logger.removeFilter, self.rate_filter)
+
+    def test_same_template_passes_burst_then_drops(self):
+        with self.assertLogs(self.logger, level='WARNING') as captured:
+            for i in range(10):
+                self.logger.warning("重连失败: %s", i)
+        self.assertEqual(captured.output, [f"WARNING:{self.logger.name}:重连失败: {i}" for i in range(3)])
+
+    def test_errors_are_never_dropped(self):
+        with self.assertLogs(self.logger, level='ERROR') as captured:
+            for i in range(10):
+                self.logger.error("连接失败: %s", i)
+        self.assertEqual(len(captured.output), 10)
+
+    def test_window_rollover_reports_suppressed_count(self):
+        with self.assertLogs(self.logger, level='WARNING') as captured:
+            for i in range(5):
+                self.logger.warning("重连失败: %s", i)
+            self.rate_filter._windows["重连失败: %s"][0] -= self.rate_filter.interval
+            self.logger.warning("重连失败: %s", 5)
+        self.assertEqual(len(captured.output), 5)
+        self.assertIn("已抑制2条相似日志", captured.output[3])
+        self.assertTrue(captured.output[4].endswith("重连失败: 5"))
+
+
+if __name__ == '__main__':
+    unittest.main()
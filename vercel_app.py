@@ -4,25 +4,38 @@
 import os
 import sys
 import json
+import hashlib
+import orjson
 import logging
+import functools
+import array
+import time
 from datetime import datetime, timedelta
+from types import MappingProxyType
 
 # 设置默认编码为UTF-8
-sys.stdout.reconfigure(encoding='utf-8')
-sys.stderr.reconfigure(encoding='utf-8')
+# 已是UTF-8时跳过，避免重复重建输出流
+for _stream in (sys.stdout, sys.stderr):
+    if (_stream.encoding or '').lower() not in ('utf-8', 'utf8'):
+        _stream.reconfigure(encoding='utf-8')
 
-# 设置环境变量，确保在Vercel环境中正确运行
-os.environ['CONFIG_NAME'] = 'production'
-os.environ['DEBUG'] = 'false'
+# 设置环境变量，确保在Vercel环境中正确运行；平台已注入的配置优先
+os.environ.setdefault('CONFIG_NAME', 'production')
+os.environ.setdefault('DEBUG', 'false')
+os.environ.setdefault('MAX_TANKS', '11')
+os.environ.setdefault('PORT', '80')
+# 无服务器环境不支持SocketIO长连接，始终禁用
 os.environ['DISABLE_SOCKETIO'] = 'true'
-os.environ['MAX_TANKS'] = '11'
-os.environ['PORT'] = '80'
+
+# 罐数量在模块加载时解析一次，请求处理中直接使用
+MAX_TANKS = int(os.environ.get('MAX_TANKS', 11))
 
 # 获取当前文件目录
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
 # 导入Flask
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, jsonify, request, render_template
+from flask.json.provider import DefaultJSONProvider
 
 # 初始化Flask应用，并设置模板和静态文件路径
 app = Flask(
@@ -31,137 +44,166 @@ app = Flask(
     static_folder=os.path.join(current_dir, 'static')
 )
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+class ORJSONProvider(DefaultJSONProvider):
+    """基于orjson的Flask JSON提供器，jsonify和request.json均使用orjson编解码"""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app.json = ORJSONProvider(app)
+
+# 日志在首次输出错误时才配置，冷启动时不创建输出处理器
 logger = logging.getLogger('VercelApp')
+logger.addHandler(logging.NullHandler())
+
+@functools.cache
+def _ensure_logging():
+    """配置日志输出到控制台，只在第一次调用时生效"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+
+@functools.lru_cache(maxsize=256)
+def _mock_history_values(limit):
+    """模拟历史数据中固定的 (温度, 液位) 序列，按条数缓存"""
+    return tuple((150.0 + (i % 5 - 2), 50.0 + (i % 10 - 5)) for i in range(limit))
 
 # 模拟数据管理器类，用于Vercel环境，避免文件操作和后台线程
 class MockDataManager:
+    """罐状态按字段分列存储（每个数值字段一个连续数组），第i个元素对应罐 i+1"""
     def __init__(self):
         # 初始化内存中的数据结构
-        self.tanks_data = {}
         self.initialize_tanks()
         logger.info("MockDataManager已初始化")
     
     def initialize_tanks(self):
         # 初始化11个罐的模拟数据
-        max_tanks = int(os.environ.get('MAX_TANKS', 11))
-        for i in range(1, max_tanks + 1):
-            self.tanks_data[str(i)] = {
-                'tank_id': str(i),
-                'timestamp': datetime.now().isoformat(),
-                'temperature': 150.0,
-                'level': 50.0,
-                'pressure': 1.0,
-                'error': 0.0,
-                'status': 'normal',
-                'alert_message': '',
-                'name': f'{i}#沥青罐'
-            }
+        n = MAX_TANKS
+        self.tank_ids = tuple(str(i) for i in range(1, n + 1))
+        self.tank_index = {tank_id: i for i, tank_id in enumerate(self.tank_ids)}
+        self.names = tuple(f'{i}#沥青罐' for i in range(1, n + 1))
+        self.temperatures = array.array('d', [150.0]) * n
+        self.levels = array.array('d', [50.0]) * n
+        self.pressures = array.array('d', [1.0]) * n
+        self.errors = array.array('d', [0.0]) * n
+        self.statuses = ['normal'] * n
+        self.alert_messages = [''] * n
+        self.timestamps = [datetime.now().isoformat()] * n
+    
+    def _tank_record(self, i):
+        """按下标组装单个罐的数据字典"""
+        return {
+            'tank_id': self.tank_ids[i],
+            'timestamp': self.timestamps[i],
+            'temperature': self.temperatures[i],
+            'level': self.levels[i],
+            'pressure': self.pressures[i],
+            'error': self.errors[i],
+            'status': self.statuses[i],
+            'alert_message': self.alert_messages[i],
+            'name': self.names[i]
+        }
     
     def get_tank_data(self, tank_id=None):
         if tank_id:
-            return self.tanks_data.get(str(tank_id), {})
-        return self.tanks_data
+            i = self.tank_index.get(str(tank_id))
+            return self._tank_record(i) if i is not None else {}
+        return {tank_id: self._tank_record(i) for i, tank_id in enumerate(self.tank_ids)}
     
     def get_tank_history(self, tank_id, start_time=None, end_time=None, limit=10):
         # 返回模拟历史数据
-        tank_id_str = str(tank_id)
-        if tank_id_str not in self.tanks_data:
+        if str(tank_id) not in self.tank_index:
             return []
         
-        history = []
-        # 生成最近10个时间点的模拟数据
-        for i in range(limit):
-            timestamp = (datetime.now() - timedelta(minutes=i*10)).isoformat()
-            history.append({
-                'timestamp': timestamp,
-                'temperature': 150.0 + (i % 5 - 2),
-                'level': 50.0 + (i % 10 - 5),
+        # 生成最近limit个时间点的模拟数据，只有时间戳随请求变化
+        now = datetime.now()
+        step = timedelta(minutes=10)
+        return [
+            {
+                'timestamp': (now - i * step).isoformat(),
+                'temperature': temperature,
+                'level': level,
                 'pressure': 1.0,
                 'status': 'normal'
-            })
-        
-        return history
+            }
+            for i, (temperature, level) in enumerate(_mock_history_values(limit))
+        ]
     
     def get_all_tanks_summary(self):
-        summary = {}
-        for tank_id, data in self.tanks_data.items():
-            summary[tank_id] = {
+        return {
+            tank_id: {
                 'tank_id': tank_id,
-                'status': data['status'],
-                'temperature': data['temperature'],
-                'level': data['level'],
-                'pressure': data['pressure'],
-                'alert_message': data['alert_message'],
-                'last_updated': data['timestamp'],
-                'name': data['name']
+                'status': status,
+                'temperature': temperature,
+                'level': level,
+                'pressure': pressure,
+                'alert_message': alert_message,
+                'last_updated': timestamp,
+                'name': name
             }
-        return summary
+            for tank_id, status, temperature, level, pressure, alert_message, timestamp, name in zip(
+                self.tank_ids, self.statuses, self.temperatures, self.levels, self.pressures,
+                self.alert_messages, self.timestamps, self.names)
+        }
 
 # 初始化模拟数据管理器
 data_manager = MockDataManager()
 
+# 健康检查响应模板，时间戳每秒最多生成一次，频繁探测时直接复用
+_HEALTH_TEMPLATE = '{"status":"healthy","timestamp":"%s","environment":"Vercel Serverless"}'
+_health_cache = (float('-inf'), b'')  # (生成时的单调时钟, 响应体)
+
 # 健康检查端点
 @app.route('/api/health')
 def health_check():
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'environment': 'Vercel Serverless'
-    })
+    global _health_cache
+    now = time.monotonic()
+    if now - _health_cache[0] >= 1.0:
+        _health_cache = (now, (_HEALTH_TEMPLATE % datetime.now().isoformat()).encode('utf-8'))
+    return Response(_health_cache[1], mimetype='application/json')
+
+# 罐数据接口返回的模拟数据固定不变，在模块加载时序列化一次
+_STATIC_TANKS_JSON = json.dumps({
+    'success': True,
+    'data': {
+        i: {
+            'id': i,
+            'name': f'{i}#沥青罐',
+            'temperature': 150.0,
+            'level': 50.0,
+            'weight': 0.0,
+            'height': 8.0,
+            'high_limit': 6.4,
+            'alarm_shown': False,
+            'error': 0.0
+        }
+        for i in range(1, MAX_TANKS + 1)
+    }
+}, ensure_ascii=False).encode('utf-8')
+_STATIC_TANKS_ETAG = hashlib.blake2b(_STATIC_TANKS_JSON, digest_size=8).hexdigest()
+
+def static_tanks_response():
+    """返回预先序列化的罐数据，客户端已缓存相同内容时返回304"""
+    if request.if_none_match.contains(_STATIC_TANKS_ETAG):
+        response = Response(status=304)
+    else:
+        response = Response(_STATIC_TANKS_JSON, mimetype='application/json')
+    response.set_etag(_STATIC_TANKS_ETAG)
+    return response
 
 # 获取所有罐数据的API端点
 @app.route('/api/tanks')
 def get_tanks():
-    try:
-        # 返回模拟的罐数据
-        tanks = {}
-        max_tanks = int(os.environ.get('MAX_TANKS', 11))
-        for i in range(1, max_tanks + 1):
-            tanks[i] = {
-                'id': i,
-                'name': f'{i}#沥青罐',
-                'temperature': 150.0,
-                'level': 50.0,
-                'weight': 0.0,
-                'height': 8.0,
-                'high_limit': 6.4,
-                'alarm_shown': False,
-                'error': 0.0
-            }
-        return jsonify({'success': True, 'data': tanks})
-    except Exception as e:
-        logger.error(f"获取罐数据时出错: {str(e)}")
-        return jsonify({'success': False, 'message': str(e)}), 500
+    return static_tanks_response()
 
 # 获取当前罐数据的API端点
 @app.route('/api/tanks/data')
 def get_tanks_data():
-    try:
-        # 返回模拟的罐数据
-        tanks_data = {}
-        max_tanks = int(os.environ.get('MAX_TANKS', 11))
-        for i in range(1, max_tanks + 1):
-            tanks_data[i] = {
-                'id': i,
-                'name': f'{i}#沥青罐',
-                'temperature': 150.0,
-                'level': 50.0,
-                'weight': 0.0,
-                'height': 8.0,
-                'high_limit': 6.4,
-                'alarm_shown': False,
-                'error': 0.0
-            }
-        return jsonify({'success': True, 'data': tanks_data})
-    except Exception as e:
-        logger.error(f"获取罐数据时出错: {str(e)}")
-        return jsonify({'success': False, 'message': str(e)}), 500
+    return static_tanks_response()
 
 # MQTT状态端点
 @app.route('/api/mqtt/status')
@@ -207,37 +249,45 @@ def history_points():
 @app.route('/api/history/<tank_id>')
 def get_tank_history(tank_id):
     try:
-        limit = request.args.get('limit', 10, type=int)
+        # limit由客户端控制且作为模拟数据的缓存键，限制在合理范围内
+        limit = max(0, min(request.args.get('limit', 10, type=int), 1000))
         history = data_manager.get_tank_history(tank_id, limit=limit)
         return jsonify({'success': True, 'data': history})
     except Exception as e:
+        _ensure_logging()
         logger.error(f"获取罐历史数据时出错: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 # 主页路由
+# 主页展示的模拟罐数据固定不变，在模块加载时构建一次
+_INDEX_TANKS = {
+    i: MappingProxyType({
+        'id': i,
+        'name': f'{i}#沥青罐',
+        'temperature': 150.0 + (i * 2),  # 给每个罐一个不同的温度
+        'level': 3.0 + (i * 0.3),  # 给每个罐一个不同的液位
+        'weight': 20.0 + (i * 2),  # 给每个罐一个不同的重量
+        'height': 8.0,
+        'high_limit': 6.4,
+        'alarm_shown': False,
+        'error': 0.0
+    })
+    for i in range(1, MAX_TANKS + 1)
+}
+
+@functools.lru_cache(maxsize=1)
+def _render_index():
+    """渲染主页，模板输入全部固定，首次渲染后直接复用结果"""
+    return render_template('index.html', tanks=_INDEX_TANKS, os=os)
+
 @app.route('/')
 @app.route('/index')
 def index():
     try:
-        # 生成模拟的罐数据
-        max_tanks = int(os.environ.get('MAX_TANKS', 11))
-        tanks = {}
-        for i in range(1, max_tanks + 1):
-            tanks[i] = {
-                'id': i,
-                'name': f'{i}#沥青罐',
-                'temperature': 150.0 + (i * 2),  # 给每个罐一个不同的温度
-                'level': 3.0 + (i * 0.3),  # 给每个罐一个不同的液位
-                'weight': 20.0 + (i * 2),  # 给每个罐一个不同的重量
-                'height': 8.0,
-                'high_limit': 6.4,
-                'alarm_shown': False,
-                'error': 0.0
-            }
-        
         # 渲染完整的index.html模板，并传递必要的变量
-        return render_template('index.html', tanks=tanks, os=os)
+        return _render_index()
     except Exception as e:
+        _ensure_logging()
         logger.error(f"加载主页时出错: {str(e)}")
         return str(e), 500
 
@@ -8,72 +8,86 @@
 
 import os
 import sys
-import importlib
-from datetime import datetime
+import threading
+import time
+import orjson
 
 # 设置默认编码为UTF-8
-sys.stdout.reconfigure(encoding='utf-8')
-sys.stderr.reconfigure(encoding='utf-8')
+# 已是UTF-8时跳过，避免重复重建输出流
+for _stream in (sys.stdout, sys.stderr):
+    if (_stream.encoding or '').lower() not in ('utf-8', 'utf8'):
+        _stream.reconfigure(encoding='utf-8')
 
 # 确保在Vercel环境中正确加载环境变量
 if 'VERCEL' in os.environ:
-    # 生产环境设置
-    os.environ['CONFIG_NAME'] = 'production'
-    os.environ['DEBUG'] = 'false'
-    os.environ['PORT'] = '80'
-    os.environ['MAX_TANKS'] = '11'
+    # 生产环境设置，平台已注入的配置优先
+    os.environ.setdefault('CONFIG_NAME', 'production')
+    os.environ.setdefault('DEBUG', 'false')
+    os.environ.setdefault('PORT', '80')
+    os.environ.setdefault('MAX_TANKS', '11')
 
 # 禁用SocketIO功能以适应Vercel的无服务器环境
 os.environ['DISABLE_SOCKETIO'] = 'true'
 
-# 初始化Flask应用，但避免立即导入app模块
-app = None
-initialized = False
+# 运行环境名称在模块加载时读取一次，健康检查直接返回
+CONFIG_NAME = os.environ.get('CONFIG_NAME', 'unknown')
 
-def initialize_app():
-    """在第一次请求时初始化Flask应用，避免在导入时触发初始化"""
-    global app, initialized
-    if not initialized:
-        # 确保在导入app之前环境变量已设置
-        print("正在初始化Flask应用...")
-        
-        # 动态导入app模块，但阻止其自动初始化
-        # 保存原始的initialize_app函数
-        import app as app_module
-        
-        # 获取app实例
-        app = app_module.app
-        
-        # 添加健康检查端点
-        @app.route('/api/health')
-        def health_check():
-            """健康检查端点，用于Vercel监控应用状态"""
-            return {
-                "status": "healthy",
-                "timestamp": datetime.now().isoformat(),
-                "environment": os.environ.get('CONFIG_NAME', 'unknown')
-            }
-        
-        initialized = True
-        print("Flask应用初始化完成")
+# 健康检查响应模板，时间戳每秒最多生成一次，频繁探测时直接复用
+_HEALTH_TEMPLATE = '{"status":"healthy","timestamp":"%s","environment":' + orjson.dumps(CONFIG_NAME).decode('utf-8') + '}'
+_health_cache = (float('-inf'), b'')  # (生成时的单调时钟, 响应体)
+
+# 已初始化的Flask应用，以及保护首次初始化的锁
+_app = None
+_app_lock = threading.Lock()
+
+def _get_app():
+    """在第一次请求时初始化Flask应用，避免在导入时触发初始化
+    
+    初始化完成后直接返回缓存的应用实例；多线程服务器上并发的首次请求由锁保证
+    只初始化一次，避免重复注册健康检查端点。
+    
+    Returns:
+        Flask: 已添加健康检查端点的Flask应用
+    """
+    if _app is not None:
+        return _app
+    with _app_lock:
+        if _app is None:
+            _init_app()
+        return _app
+
+def _init_app():
+    """导入app模块并添加健康检查端点，由_get_app在持有锁时调用"""
+    global _app
+    # 确保在导入app之前环境变量已设置
+    print("正在初始化Flask应用...")
+    
+    # 首次请求时才导入app模块及其依赖
+    from datetime import datetime
+    from flask import Response
+    from app import app
+    
+    # 添加健康检查端点
+    @app.route('/api/health')
+    def health_check():
+        """健康检查端点，用于Vercel监控应用状态"""
+        global _health_cache
+        now = time.monotonic()
+        if now - _health_cache[0] >= 1.0:
+            _health_cache = (now, (_HEALTH_TEMPLATE % datetime.now().isoformat()).encode('utf-8'))
+        return Response(_health_cache[1], mimetype='application/json')
+    
+    print("Flask应用初始化完成")
+    _app = app
 
 # WSGI应用入口点
 def application(environ, start_response):
-    """标准WSGI应用入口点函数，在第一次请求时初始化应用"""
-    # 将环境变量传递给应用
-    for key, value in environ.items():
-        if key.startswith('HTTP_'):
-            # 将HTTP头转换为环境变量
-            env_key = key[5:].upper().replace('-', '_')
-            os.environ[env_key] = value
-        elif key == 'PATH_INFO':
-            os.environ['PATH_INFO'] = value
+    """标准WSGI应用入口点函数，在第一次请求时初始化应用
     
-    # 延迟初始化应用
-    initialize_app()
-
+    请求头等请求信息通过flask.request读取，不写入进程环境变量。
+    """
     # 使用Flask的WSGI应用处理请求
-    return app(environ, start_response)
+    return _get_app()(environ, start_response)
 
 # 如果直接运行此文件，则启动开发服务器
 if __name__ == '__main__':
@@ -82,7 +96,7 @@ if __name__ == '__main__':
     debug = os.environ.get('DEBUG', 'true').lower() == 'true'
     
     # 立即初始化应用
-    initialize_app()
+    app = _get_app()
     
     print(f"Starting WSGI server on http://{host}:{port} (debug={debug})")
-    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
+    app.run(host=host, port=port, debug=debug)